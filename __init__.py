@@ -26,7 +26,14 @@ def register():
     mod.reload_modules([pref])
     registered_classes.extend(mod.register_classes(mod.get_classes([pref])))
     prefs = bpy.context.preferences.addons[__package__].preferences
-    prefs.update_config_bundle_manifest()
+    prefs.update_config_bundle_manifest_async()
+    prefs.update_bundle_watch_interval()
+    prefs.mesh_cache.set_budget(prefs.mesh_cache_size * 1024 * 1024)
+    bpy.app.handlers.depsgraph_update_post.append(prefs.mesh_cache.on_depsgraph_update)
+    bpy.app.handlers.frame_change_post.append(prefs.mesh_cache.on_frame_change)
+    bpy.app.handlers.load_post.append(prefs.mesh_cache.on_reset)
+    bpy.app.handlers.undo_post.append(prefs.mesh_cache.on_reset)
+    bpy.app.handlers.redo_post.append(prefs.mesh_cache.on_reset)
 
     from . import operators as op
     from . import panels as pn
@@ -38,6 +45,23 @@ def register():
 
 def unregister():   
     from .functions import modules as mod
+    from . import preferences as pref
+
+    prefs = bpy.context.preferences.addons[__package__].preferences
+    prefs.bundle_refresher.stop()
+    if bpy.app.timers.is_registered(pref.watch_bundles_folder):
+        bpy.app.timers.unregister(pref.watch_bundles_folder)
+
+    for handlers, handler in [
+        (bpy.app.handlers.depsgraph_update_post, prefs.mesh_cache.on_depsgraph_update),
+        (bpy.app.handlers.frame_change_post, prefs.mesh_cache.on_frame_change),
+        (bpy.app.handlers.load_post, prefs.mesh_cache.on_reset),
+        (bpy.app.handlers.undo_post, prefs.mesh_cache.on_reset),
+        (bpy.app.handlers.redo_post, prefs.mesh_cache.on_reset),
+    ]:
+        if handler in handlers:
+            handlers.remove(handler)
+    prefs.mesh_cache.clear()
 
     mod.unregister_classes(registered_classes)
     del bpy.types.Collection.blendertoprusaslicer
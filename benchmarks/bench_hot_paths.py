@@ -0,0 +1,370 @@
+"""Benchmarks the geometry, gcode and profile hot paths of the add-on without Blender.
+
+bpy is replaced by an empty stub and meshes are synthetic grids exposing the foreach_get API the export
+functions use. Every case runs in a fresh process so its peak RSS can be reported on its own.
+
+    python benchmarks/bench_hot_paths.py [--sizes 10k 100k 1m 10m] [--gcode-mb 100] [--repeats 3]
+                                         [--baseline benchmarks/baseline.json] [--save-baseline]
+
+A case is reported as a regression when it is slower than the baseline by more than --tolerance and by more
+than --min-delta seconds, so sub-millisecond cases don't flag timer noise.
+"""
+import os
+import sys
+import json
+import time
+import types
+import shutil
+import argparse
+import tempfile
+import importlib
+import importlib.util
+import multiprocessing
+
+import numpy as np
+
+ADDON_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = 'unexpectedslicer_bench'
+DEFAULT_INI = os.path.join(ADDON_FOLDER, 'profiles', 'PrusaSlicer', '2.1.1.ini')
+DEFAULT_BASELINE = os.path.join(ADDON_FOLDER, 'benchmarks', 'baseline.json')
+SIZE_SUFFIXES = {'k': 10 ** 3, 'm': 10 ** 6}
+
+def load_addon_module(name):
+    # The add-on modules only need bpy to exist at import time for the functions benchmarked here
+    sys.modules.setdefault('bpy', types.ModuleType('bpy'))
+    if PACKAGE not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            PACKAGE, os.path.join(ADDON_FOLDER, '__init__.py'), submodule_search_locations=[ADDON_FOLDER]
+        )
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[PACKAGE] = package
+        spec.loader.exec_module(package)
+    return importlib.import_module(f'{PACKAGE}.functions.{name}')
+
+def parse_size(text):
+    text = text.lower()
+    if text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+def format_size(count):
+    for suffix, factor in (('M', 10 ** 6), ('k', 10 ** 3)):
+        if count >= factor and count % factor == 0:
+            return f"{count // factor}{suffix}"
+    return str(count)
+
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+### Synthetic Blender data
+
+class FakeProperty:
+    """Collection of mesh elements, foreach_get fills a flat buffer like bpy_prop_collection does."""
+
+    def __init__(self, **attributes):
+        self.attributes = attributes
+        self.length = len(next(iter(attributes.values())))
+
+    def __len__(self):
+        return self.length
+
+    def foreach_get(self, attribute, out):
+        out[:] = self.attributes[attribute].ravel()
+
+class FakeMatrix:
+    def __init__(self, matrix):
+        self.matrix = np.asarray(matrix, dtype=np.float64)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.matrix.astype(dtype) if dtype else self.matrix
+
+    def transposed(self):
+        return FakeMatrix(self.matrix.T)
+
+class FakeMesh:
+    def __init__(self, vertices, triangles):
+        edge_a = vertices[triangles[:, 1]] - vertices[triangles[:, 0]]
+        edge_b = vertices[triangles[:, 2]] - vertices[triangles[:, 0]]
+        normals = np.cross(edge_a, edge_b)
+        normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+        self.vertices = FakeProperty(co=vertices)
+        self.loop_triangles = FakeProperty(vertices=triangles, normal=normals)
+
+class FakeObject:
+    def __init__(self, name, mesh, matrix_world):
+        self.name = name
+        self.data = mesh
+        self.matrix_world = FakeMatrix(matrix_world)
+
+def grid_object(tris_count, name="Grid"):
+    """A wavy grid with about tris_count triangles, two per quad, with a rotated and offset world matrix."""
+    side = max(1, int(np.sqrt(tris_count / 2)))
+    xs, ys = np.meshgrid(np.arange(side + 1, dtype=np.float64), np.arange(side + 1, dtype=np.float64))
+    zs = np.sin(xs * 0.1) * np.cos(ys * 0.1)
+    vertices = np.stack([xs.ravel(), ys.ravel(), zs.ravel()], axis=1) / side
+
+    quads = np.arange((side + 1) * side).reshape(side, side + 1)[:, :side].ravel()
+    corners = np.stack([quads, quads + 1, quads + side + 2, quads + side + 1], axis=1)
+    triangles = np.concatenate([corners[:, [0, 1, 2]], corners[:, [0, 2, 3]]]).astype(np.int32)
+
+    angle = 0.3
+    matrix_world = np.array([
+        [np.cos(angle), -np.sin(angle), 0, 0.1],
+        [np.sin(angle), np.cos(angle), 0, 0.2],
+        [0, 0, 1, 0.3],
+        [0, 0, 0, 1],
+    ])
+    return FakeObject(name, FakeMesh(vertices, triangles), matrix_world)
+
+def write_gcode(path, size_mb):
+    """Writes gcode shaped like PrusaSlicer's: moves, then the summary comments and the config block."""
+    rng = np.random.default_rng(0)
+    target = size_mb * 1024 * 1024
+    with open(path, 'w') as file:
+        file.write("; generated by PrusaSlicer 2.8.1\n\n")
+        written = 0
+        while written < target:
+            coords = rng.uniform(0, 250, size=(10000, 3))
+            block = "".join(f"G1 X{x:.3f} Y{y:.3f} E{e:.5f}\n" for x, y, e in coords)
+            file.write(block)
+            written += len(block)
+        file.write(
+            "; filament used [mm] = 1234.56\n"
+            "; filament used [g] = 3.71\n"
+            "; estimated printing time (normal mode) = 1h 2m 3s\n\n"
+            "; prusaslicer_config = begin\n"
+        )
+        file.write("".join(f"; setting_{i} = {i}\n" for i in range(800)))
+        file.write("; prusaslicer_config = end\n")
+
+### Benchmark cases, each returns (seconds, work units) for its best run
+
+def best_of(function, repeats):
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings)
+
+def bench_objects_to_tris(size, repeats, workdir):
+    bf = load_addon_module('blender_funcs')
+    objects = [grid_object(size)]
+    return best_of(lambda: bf.objects_to_tris(objects, 1000), repeats), len(objects[0].data.loop_triangles)
+
+def bench_objects_to_tris_compact(size, repeats, workdir):
+    bf = load_addon_module('blender_funcs')
+    objects = [grid_object(size)]
+    return best_of(lambda: bf.objects_to_tris_compact(objects, 1000), repeats), len(objects[0].data.loop_triangles)
+
+def bench_objects_to_indexed(size, repeats, workdir):
+    bf = load_addon_module('blender_funcs')
+    objects = [grid_object(size)]
+    return best_of(lambda: bf.objects_to_indexed(objects, 1000), repeats), len(objects[0].data.loop_triangles)
+
+def bench_transform_tris(size, repeats, workdir):
+    bf = load_addon_module('blender_funcs')
+    tris = bf.objects_to_tris_compact([grid_object(size)], 1000)
+    vertices = tris.reshape(-1, 3)
+    offset = np.array([125.0, 105.0, 0.0])
+    return best_of(lambda: bf.transform_tris(vertices, offset), repeats), tris.shape[0]
+
+def bench_save_stl(size, repeats, workdir):
+    bf = load_addon_module('blender_funcs')
+    tris = bf.objects_to_tris_compact([grid_object(size)], 1000)
+    path = os.path.join(workdir, 'bench.stl')
+    return best_of(lambda: bf.save_stl(tris, path, chunk_size=bf.STL_CHUNK_SIZE), repeats), tris.shape[0]
+
+def bench_calculate_md5(size, repeats, workdir):
+    bf = load_addon_module('blender_funcs')
+    tris = bf.objects_to_tris_compact([grid_object(size)], 1000)
+    path = os.path.join(workdir, 'bench.stl')
+    bf.save_stl(tris, path, chunk_size=bf.STL_CHUNK_SIZE)
+    return best_of(lambda: bf.calculate_md5([path]), repeats), tris.shape[0]
+
+def bench_calculate_array_digest(size, repeats, workdir):
+    bf = load_addon_module('blender_funcs')
+    tris = bf.objects_to_tris_compact([grid_object(size)], 1000)
+    return best_of(lambda: bf.calculate_array_digest([tris]), repeats), tris.shape[0]
+
+def bench_parse_gcode_stats(size_mb, repeats, workdir):
+    gf = load_addon_module('gcode_funcs')
+    path = os.path.join(workdir, 'bench.gcode')
+    write_gcode(path, size_mb)
+    keys = ['estimated printing time (normal mode)', 'filament used [g]']
+    return best_of(lambda: gf.get_gcode_stats(path, keys), repeats), os.path.getsize(path)
+
+def bench_parse_gcode_missing_key(size_mb, repeats, workdir):
+    # Worst case, the key isn't there and the whole file is read backwards
+    gf = load_addon_module('gcode_funcs')
+    path = os.path.join(workdir, 'bench.gcode')
+    write_gcode(path, size_mb)
+    return best_of(lambda: gf.parse_gcode(path, 'missing key'), repeats), os.path.getsize(path)
+
+def _bench_local_cache_scan(ini_path, repeats, workdir, lazy):
+    caching_local = load_addon_module('caching_local')
+    shutil.copy(ini_path, workdir)
+
+    def scan():
+        cache = caching_local.LocalCache(lazy=lazy)
+        cache.directory = workdir
+        cache.load_ini_files()
+        cache.process_all_files()
+
+    return best_of(scan, repeats), os.path.getsize(ini_path)
+
+def bench_local_cache_scan(ini_path, repeats, workdir):
+    return _bench_local_cache_scan(ini_path, repeats, workdir, lazy=False)
+
+def bench_local_cache_scan_lazy(ini_path, repeats, workdir):
+    return _bench_local_cache_scan(ini_path, repeats, workdir, lazy=True)
+
+def _loaded_cache(ini_path, workdir):
+    caching_local = load_addon_module('caching_local')
+    shutil.copy(ini_path, workdir)
+    cache = caching_local.LocalCache()
+    cache.directory = workdir
+    cache.load_ini_files()
+    cache.process_all_files()
+    keys = sorted(key for key in cache.config_headers if key.split(':')[0] in ('printer', 'filament', 'print'))
+    return cache, keys
+
+def bench_generate_config(ini_path, repeats, workdir):
+    bf = load_addon_module('blender_funcs')
+    cache, keys = _loaded_cache(ini_path, workdir)
+    return best_of(lambda: [bf.generate_config(key, cache.config_headers) for key in keys], repeats), len(keys)
+
+def bench_resolve_config(ini_path, repeats, workdir):
+    # Cold memo on every run, so this measures flattening every profile once through resolve_config
+    cache, keys = _loaded_cache(ini_path, workdir)
+
+    def resolve_all():
+        cache.resolved_configs.clear()
+        cache._resolved_dependencies.clear()
+        cache._resolved_dependents.clear()
+        for key in keys:
+            cache.resolve_config(key)
+
+    return best_of(resolve_all, repeats), len(keys)
+
+MESH_CASES = [
+    (bench_objects_to_tris, 'tris/s'),
+    (bench_objects_to_tris_compact, 'tris/s'),
+    (bench_objects_to_indexed, 'tris/s'),
+    (bench_transform_tris, 'tris/s'),
+    (bench_save_stl, 'tris/s'),
+    (bench_calculate_md5, 'tris/s'),
+    (bench_calculate_array_digest, 'tris/s'),
+]
+GCODE_CASES = [
+    (bench_parse_gcode_stats, 'MB/s'),
+    (bench_parse_gcode_missing_key, 'MB/s'),
+]
+CONFIG_CASES = [
+    (bench_local_cache_scan, 'MB/s'),
+    (bench_local_cache_scan_lazy, 'MB/s'),
+    (bench_generate_config, 'profiles/s'),
+    (bench_resolve_config, 'profiles/s'),
+]
+
+def run_case(function, argument, repeats):
+    # Runs in a child process, so the peak RSS only covers this case
+    with tempfile.TemporaryDirectory(prefix='unexpectedslicer_bench_') as workdir:
+        seconds, units = function(argument, repeats, workdir)
+    return seconds, units, peak_rss_mb()
+
+### Reporting
+
+def case_name(function, label):
+    return f"{function.__name__[len('bench_'):]}[{label}]"
+
+def run_all(args):
+    cases = [(function, size, format_size(size), unit) for size in args.sizes for function, unit in MESH_CASES]
+    cases += [(function, args.gcode_mb, f"{args.gcode_mb}MB", unit) for function, unit in GCODE_CASES]
+    cases += [(function, args.ini, os.path.basename(args.ini), unit) for function, unit in CONFIG_CASES]
+
+    results = {}
+    context = multiprocessing.get_context('spawn')
+    for function, argument, label, unit in cases:
+        name = case_name(function, label)
+        with context.Pool(1) as pool:
+            seconds, units, peak_rss = pool.apply(run_case, (function, argument, args.repeats))
+        if unit == 'MB/s':
+            units /= 1024 * 1024
+        results[name] = {
+            'seconds': round(seconds, 6),
+            'throughput': round(units / seconds, 2) if seconds else None,
+            'unit': unit,
+            'peak_rss_mb': round(peak_rss, 1) if peak_rss is not None else None,
+        }
+        print_result(name, results[name])
+    return results
+
+def print_result(name, result, comparison=""):
+    rss = f"{result['peak_rss_mb']:>8.1f} MB" if result['peak_rss_mb'] is not None else f"{'n/a':>11}"
+    print(f"{name:<44} {result['seconds']:>10.4f}s {result['throughput']:>14,.0f} {result['unit']:<10} {rss}{comparison}")
+
+def compare(results, baseline, tolerance, min_delta):
+    """Prints the change against the baseline for every case, returns the names of the regressed cases."""
+    regressions = []
+    print(f"\nCompared with the baseline (tolerance {tolerance:.0%}):")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous.get('seconds'):
+            print(f"{name:<44} new")
+            continue
+        ratio = result['seconds'] / previous['seconds']
+        regressed = ratio > 1 + tolerance and result['seconds'] - previous['seconds'] > min_delta
+        status = "REGRESSION" if regressed else "ok"
+        if status == "REGRESSION":
+            regressions.append(name)
+        print(f"{name:<44} {previous['seconds']:>10.4f}s -> {result['seconds']:.4f}s ({ratio:.2f}x) {status}")
+    return regressions
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmarks the add-on hot paths without Blender.")
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=[10 ** 4, 10 ** 5, 10 ** 6],
+                        help="Triangle counts of the synthetic meshes, e.g. 10k 1m 10m (10m needs several GB of RAM)")
+    parser.add_argument('--gcode-mb', type=int, default=50, help="Size of the generated gcode file")
+    parser.add_argument('--ini', default=DEFAULT_INI, help="Bundle used for the profile benchmarks")
+    parser.add_argument('--repeats', type=int, default=3, help="Runs per case, the fastest one is reported")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Results of a previous run to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="Slowdown allowed before a case counts as a regression")
+    parser.add_argument('--min-delta', type=float, default=0.002, help="Slowdown in seconds below which a case never counts as a regression")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+
+    print(f"{'case':<44} {'best':>11} {'throughput':>14} {'':<10} {'peak RSS':>11}")
+    results = run_all(args)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r') as file:
+            regressions = compare(results, json.load(file)['results'], args.tolerance, args.min_delta)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump({'python': sys.version.split()[0], 'numpy': np.__version__, 'results': results}, file, indent=2)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Compares the single-pass INI parser with the former ConfigParser based one on the bundled profiles.
+
+Runs without Blender: python benchmarks/bench_ini_parser.py [path/to/bundle.ini] [repeats]
+"""
+import os
+import re
+import sys
+import time
+import importlib.util
+from configparser import ConfigParser, MissingSectionHeaderError
+
+ADDON_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_INI = os.path.join(ADDON_FOLDER, 'profiles', 'PrusaSlicer', '2.1.1.ini')
+
+def load_ini_parser():
+    path = os.path.join(ADDON_FOLDER, 'functions', 'ini_parser.py')
+    spec = importlib.util.spec_from_file_location('ini_parser', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def configparser_parse_ini(path):
+    # The implementation LocalCache._process_ini_to_cache_dict used before the single-pass parser
+    with open(path, 'r') as file:
+        content = file.read()
+
+    config = ConfigParser(interpolation=None)
+    try:
+        config.read_string(content)
+        has_header = True
+    except MissingSectionHeaderError:
+        if re.search(r'^filament_settings_id', content, re.MULTILINE):
+            cat = 'filament'
+        elif re.search(r'^print_settings_id', content, re.MULTILINE):
+            cat = 'print'
+        elif re.search(r'^printer_settings_id', content, re.MULTILINE):
+            cat = 'printer'
+        else:
+            raise ValueError(f"Unable to determine category for the INI file: {path}")
+
+        name = os.path.splitext(os.path.basename(path))[0]
+        config.read_string(f"[{cat}:{name}]\n" + content)
+        has_header = False
+
+    ini_dict = {
+        section: dict(sorted(config.items(section)))
+        for section in sorted(config.sections())
+    }
+    return ini_dict, has_header
+
+def best_of(function, path, repeats):
+    timings = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        result = function(path)
+        timings.append(time.perf_counter() - start_time)
+    return min(timings), result
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_INI
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    ini_parser = load_ini_parser()
+    legacy_time, legacy_result = best_of(configparser_parse_ini, path, repeats)
+    fast_time, fast_result = best_of(ini_parser.parse_ini, path, repeats)
+
+    legacy_sections, legacy_header = legacy_result
+    fast_sections, fast_header = fast_result
+    matches = legacy_header == fast_header and legacy_sections == {k: dict(sorted(v.items())) for k, v in sorted(fast_sections.items())}
+
+    print(f"{os.path.basename(path)}: {len(fast_sections)} sections, {os.path.getsize(path) / 1024:.0f} KB")
+    print(f"ConfigParser  - {legacy_time:.4f}s")
+    print(f"parse_ini     - {fast_time:.4f}s ({legacy_time / fast_time:.1f}x)")
+    print(f"Results match - {matches}")
+    return 0 if matches else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
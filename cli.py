@@ -0,0 +1,24 @@
+# Headless slicing entry point, run with:
+#   blender -b [file.blend] -P cli.py -- [file.blend ...] --output <folder> [--collections <name> ...] [--jobs N] [--report <file.json>]
+# The add-on has to be installed and enabled, its preferences (PrusaSlicer path, bundles, caches) are used as is.
+import bpy # type: ignore
+
+import sys, importlib
+
+def find_addon_package():
+    # The enabled copy of the add-on, which isn't necessarily the folder this script is run from
+    for name in bpy.context.preferences.addons.keys():
+        module = sys.modules.get(name)
+        if getattr(module, 'TYPES_NAME', None) == "blendertoprusaslicer":
+            return name
+    return None
+
+if __name__ == "__main__":
+    package = find_addon_package()
+    if package is None:
+        sys.stderr.write("UnexpectedSlicer is not enabled in this Blender installation\n")
+        sys.exit(2)
+
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    headless = importlib.import_module(f"{package}.headless")
+    sys.exit(headless.main(argv, package))
@@ -5,7 +5,6 @@ import time
 import shutil
 import multiprocessing
 import platform
-import csv
 import os
 
 import cProfile
@@ -98,25 +97,6 @@ class ParamRemoveOperator(bpy.types.Operator):
     def triggers(self):
         pass
 
-def parse_csv_to_tuples(filename):
-    if not hasattr(parse_csv_to_tuples, 'cache'):
-        parse_csv_to_tuples.cache = {}
-
-    current_mtime = os.path.getmtime(filename)
-
-    if filename in parse_csv_to_tuples.cache:
-        cached_mtime, cached_data = parse_csv_to_tuples.cache[filename]
-        if current_mtime == cached_mtime:
-            return cached_data
-
-    with open(filename, 'r', newline='') as f:
-        reader = csv.reader(f)
-        data = [tuple(row) for row in reader]
-
-    parse_csv_to_tuples.cache[filename] = (current_mtime, data)
-
-    return sorted(data, key=lambda x: x[1])
-
 def is_usb_device(partition):
     if platform.system() == "Windows":
         return 'removable' in partition.opts.lower()
@@ -169,6 +149,17 @@ def profiler(function, *args):
 
     return res
 
+def profile_to_file(function, path, *args):
+    pr = cProfile.Profile()
+    pr.enable()
+    try:
+        return function(*args)
+    finally:
+        pr.disable()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pr.dump_stats(path)
+        print(f'Profile written to {path}')
+
 def totuple(a):
     return tuple(map(tuple, a))
 
@@ -0,0 +1,98 @@
+import time
+from collections import deque
+
+from .prusaslicer_funcs import SlicerJob
+
+class BatchSlicer:
+    """Runs queued slicing jobs with at most max_workers PrusaSlicer processes at once.
+
+    poll() starts queued jobs as slots free up and collects finished ones, it is called from a
+    bpy.app.timers callback in Blender or from wait() when running headless. Jobs share the GcodeCache,
+    which locks its index on disk, so batches in Blender and headless runs can use the same cache at once.
+    """
+
+    def __init__(self, prusaslicer_path, max_workers=2):
+        self.prusaslicer_path = prusaslicer_path
+        self.max_workers = max(1, max_workers)
+        self.queued = deque()
+        self.jobs = {}  # Name -> started SlicerJob
+        self.results = {}  # Name -> result dict, None until the job is done, in submission order
+        self.outputs = {}  # Gcode path -> name of the job writing it
+        self.cancelled = False
+        self.start_time = time.time()
+        self.end_time = None
+
+    def submit(self, name, command, on_finished):
+        """Queues a job, on_finished(job) runs on the job's reader thread and returns the result stats."""
+        self.results[name] = None
+        self.queued.append((name, command, on_finished))
+
+    def add_result(self, name, status, error=None, seconds=0.0, **stats):
+        # Jobs that never reach PrusaSlicer, e.g. cache hits, skipped collections or failed exports
+        self.results[name] = dict(name=name, status=status, error=error, seconds=round(seconds, 3), **stats)
+
+    @property
+    def finished(self):
+        return all(result is not None for result in self.results.values())
+
+    @property
+    def running(self):
+        return sum(1 for job in self.jobs.values() if not job.done.is_set())
+
+    def poll(self):
+        """Advances the batch, returns True once every job has a result."""
+        for name, job in self.jobs.items():
+            if job.done.is_set() and self.results[name] is None:
+                self._collect(name, job)
+
+        while self.queued and self.running < self.max_workers and not self.cancelled:
+            name, command, on_finished = self.queued.popleft()
+            self.jobs[name] = SlicerJob(command, self.prusaslicer_path).start(on_finished)
+
+        if self.cancelled:
+            while self.queued:
+                self.add_result(self.queued.popleft()[0], 'cancelled', "Cancelled")
+
+        if self.finished and self.end_time is None:
+            self.end_time = time.time()
+        return self.finished
+
+    def _collect(self, name, job):
+        stats = dict(job.result or {})
+        stats.pop('progress_pct', None)
+        stats.pop('progress_text', None)
+        if job.cancelled:
+            status = 'cancelled'
+        else:
+            status = 'failed' if job.error or job.result is None else 'done'
+        self.add_result(name, status, job.error, time.time() - job.start_time if job.start_time else 0.0, **stats)
+
+    def wait(self, interval=0.1):
+        while not self.poll():
+            time.sleep(interval)
+        return self.report()
+
+    def cancel(self):
+        self.cancelled = True
+        for job in self.jobs.values():
+            job.cancel()
+
+    def progress(self, name):
+        """Returns (percent, text) for a job, None once its result is in."""
+        if self.results.get(name) is not None:
+            return None
+        job = self.jobs.get(name)
+        return job.progress if job else (0, 'Queued')
+
+    def report(self):
+        results = [result for result in self.results.values() if result is not None]
+        return {
+            'jobs': results,
+            'total': len(self.results),
+            'succeeded': sum(1 for result in results if result['status'] in ('done', 'cached')),
+            'failed': sum(1 for result in results if result['status'] == 'failed'),
+            'cancelled': sum(1 for result in results if result['status'] == 'cancelled'),
+            'skipped': sum(1 for result in results if result['status'] == 'skipped'),
+            'max_workers': self.max_workers,
+            'seconds': round((self.end_time or time.time()) - self.start_time, 3),
+        }
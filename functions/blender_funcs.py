@@ -6,6 +6,7 @@ import hashlib
 import numpy as np
 import struct
 import math
+import zipfile
 
 from collections import Counter
 
@@ -17,7 +18,7 @@ def names_array_from_objects(obj_names):
     return final_names
 
 def generate_config(id, profiles):
-    conf_current = profiles[id]['conf_dict']  # Copy to avoid modifying the original config
+    conf_current = dict(profiles[id]['conf_dict'])  # Copy to avoid modifying the original config
     if conf_current.get('inherits', False):
         curr_category = id.split(":")[0]
         inherited_ids = [curr_category + ":" + inherit_id.strip() for inherit_id in conf_current['inherits'].split(';')]  # Split on semicolon for multiple inheritance
@@ -51,13 +52,13 @@ class ConfigLoader:
             config.update(self.overrides_dict)
         return config
     
-    def load_config(self, key, profiles, append = False):
+    def load_config(self, key, profile_cache, append = False):
         if not key:
             return False
 
         if not append:
             self.config_dict = {}
-        config = generate_config(key, profiles)
+        config = profile_cache.resolve_config(key)
         self.config_dict.update(config)
 
         return True
@@ -69,6 +70,11 @@ class ConfigLoader:
                 file.write(f"{key} = {value}\n")
         return config_local_path
 
+    def config_digest(self, use_overrides = True):
+        config = self.config_with_overrides if use_overrides else self.config_dict
+        content = "".join(f"{key} = {value}\n" for key, value in config.items())
+        return hashlib.blake2b(content.encode(), digest_size=16).hexdigest()
+
     def load_ini(self, config_local_path, append = False):
         if not append:
             self.config_dict = {}
@@ -144,14 +150,23 @@ class ConfigLoader:
 
         self.overrides_dict['layer_gcode'] = combined_layer_gcode 
 
-def calculate_md5(file_paths):
+def calculate_md5(file_paths, block_size=1 << 20):
     md5_hash = hashlib.md5()
     for file_path in file_paths:
         with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
+            for byte_block in iter(lambda: f.read(block_size), b""):
                 md5_hash.update(byte_block)
     return md5_hash.hexdigest()
 
+def calculate_array_digest(arrays):
+    # Hashes the in-memory buffers directly, shape and dtype included so reinterpretations don't collide
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(memoryview(array).cast('B'))
+    return digest.hexdigest()
+
 def coll_from_selection():
     for obj in bpy.context.selected_objects:
         return obj.users_collection[0]
@@ -199,6 +214,84 @@ def objects_to_tris(selected_objects, scale):
 
     return tris
 
+def objects_to_tris_compact(selected_objects, scale, out=None):
+    # float32 (N, 3, 3) vertex-only triangles, normals are left to the slicer to recompute
+    tris_count = sum(len(obj.data.loop_triangles) for obj in selected_objects)
+    if out is None:
+        out = np.empty((tris_count, 3, 3), dtype=np.float32)
+
+    col_idx = 0
+    for obj in selected_objects:
+        mesh = obj.data
+        curr_tris_count = len(mesh.loop_triangles)
+
+        tris_v_i = np.empty(curr_tris_count * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", tris_v_i)
+
+        tris_verts = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", tris_verts)
+        tris_verts = tris_verts.reshape((-1, 3))
+
+        world_matrix = np.array(obj.matrix_world, dtype=np.float32)
+        transformed_verts = tris_verts @ (world_matrix[:3, :3].T * scale)
+        transformed_verts += world_matrix[:3, 3] * scale
+
+        np.take(transformed_verts, tris_v_i, axis=0, out=out[col_idx:col_idx + curr_tris_count].reshape(-1, 3))
+
+        col_idx += curr_tris_count
+
+    return out
+
+def objects_to_indexed(selected_objects, scale):
+    # Shared float32 vertex buffer plus int32 (N, 3) triangle indices, without expanding to a triangle soup
+    vert_count = sum(len(obj.data.vertices) for obj in selected_objects)
+    tris_count = sum(len(obj.data.loop_triangles) for obj in selected_objects)
+    verts = np.empty((vert_count, 3), dtype=np.float32)
+    faces = np.empty((tris_count, 3), dtype=np.int32)
+
+    vert_idx, tri_idx = 0, 0
+    for obj in selected_objects:
+        mesh = obj.data
+        curr_vert_count = len(mesh.vertices)
+        curr_tris_count = len(mesh.loop_triangles)
+
+        curr_verts = verts[vert_idx:vert_idx + curr_vert_count]
+        mesh.vertices.foreach_get("co", curr_verts.reshape(-1))
+
+        world_matrix = np.array(obj.matrix_world, dtype=np.float32)
+        curr_verts[:] = curr_verts @ (world_matrix[:3, :3].T * scale)
+        curr_verts += world_matrix[:3, 3] * scale
+
+        curr_faces = faces[tri_idx:tri_idx + curr_tris_count]
+        mesh.loop_triangles.foreach_get("vertices", curr_faces.reshape(-1))
+        curr_faces += vert_idx
+
+        vert_idx += curr_vert_count
+        tri_idx += curr_tris_count
+
+    return verts, faces
+
+def cached_objects_to_tris(selected_objects, scale, cache):
+    parts = [
+        cache.get_or_build(obj, 'tris', scale, lambda obj=obj: objects_to_tris_compact([obj], scale))
+        for obj in selected_objects
+    ]
+    # Concatenating copies the cached arrays, so the result can be transformed in place
+    return np.concatenate(parts) if parts else np.empty((0, 3, 3), dtype=np.float32)
+
+def cached_objects_to_indexed(selected_objects, scale, cache):
+    parts = [
+        cache.get_or_build(obj, 'indexed', scale, lambda obj=obj: objects_to_indexed([obj], scale))
+        for obj in selected_objects
+    ]
+    if not parts:
+        return np.empty((0, 3), dtype=np.float32), np.empty((0, 3), dtype=np.int32)
+
+    offsets = np.cumsum([0] + [verts.shape[0] for verts, _ in parts[:-1]])
+    verts = np.concatenate([verts for verts, _ in parts])
+    faces = np.concatenate([faces + offset for (_, faces), offset in zip(parts, offsets)])
+    return verts, faces
+
 def transform_tris(tris, v=np.array([.0, .0, .0])):
     tris[:, :3] += v
     return tris
@@ -207,12 +300,73 @@ def scale_tris(tris, s=0):
     tris[:, :3] *= s
     return tris
 
-def save_stl(tris, filename):
-    header = b'\0' * 80 + struct.pack('<I', tris.shape[0])
+STL_CHUNK_SIZE = 1 << 20
+
+STL_RECORD_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attr', '<u2'),
+])
+
+def save_stl(tris, filename, chunk_size=None):
+    # tris is (N, 4, 3) with the normal last, or (N, 3, 3) in which case normals are written as zero
+    # chunk_size bounds the number of facets packed at once, None packs the whole mesh in one buffer
+    tris_count = tris.shape[0]
+    chunk_size = chunk_size or max(tris_count, 1)
+    header = b'\0' * 80 + struct.pack('<I', tris_count)
 
     with open(filename, 'wb') as f:
         f.write(header)
-        for tri in tris:
-            v1, v2, v3, normal = tri
-            data = struct.pack('<12fH', *normal, *v1, *v2, *v3, 0)
-            f.write(data)
\ No newline at end of file
+        records = np.zeros(min(chunk_size, tris_count), dtype=STL_RECORD_DTYPE)
+        for start in range(0, tris_count, chunk_size):
+            chunk = tris[start:start + chunk_size]
+            chunk_records = records[:chunk.shape[0]]
+            chunk_records['vertices'] = chunk[:, :3]
+            if chunk.shape[1] > 3:
+                chunk_records['normal'] = chunk[:, 3]
+            chunk_records.tofile(f)
+
+def _format_rows(fmt, array, chunk_size=1 << 16):
+    # Yields the rows of a 2D array formatted with fmt, a block of rows per string
+    for start in range(0, array.shape[0], chunk_size):
+        chunk = array[start:start + chunk_size]
+        yield (fmt * chunk.shape[0]) % tuple(chunk.ravel().tolist())
+
+def save_obj(verts, faces, filename):
+    with open(filename, 'w') as f:
+        for block in _format_rows("v %.5f %.5f %.5f\n", verts):
+            f.write(block)
+        for block in _format_rows("f %d %d %d\n", faces + 1):
+            f.write(block)
+
+_3MF_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="model" ContentType="application/vnd.ms-package.3dmanufacturing-3dmodel+xml"/>'
+    '</Types>\n'
+)
+
+_3MF_RELS = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Target="/3D/3dmodel.model" Id="rel0" Type="http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel"/>'
+    '</Relationships>\n'
+)
+
+def save_3mf(verts, faces, filename):
+    with zipfile.ZipFile(filename, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        archive.writestr('[Content_Types].xml', _3MF_CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _3MF_RELS)
+        with archive.open('3D/3dmodel.model', 'w', force_zip64=True) as f:
+            f.write(
+                b'<?xml version="1.0" encoding="UTF-8"?>\n'
+                b'<model unit="millimeter" xml:lang="en-US" xmlns="http://schemas.microsoft.com/3dmanufacturing/core/2015/02">\n'
+                b'<resources><object id="1" type="model"><mesh><vertices>\n'
+            )
+            for block in _format_rows('<vertex x="%.5f" y="%.5f" z="%.5f"/>\n', verts):
+                f.write(block.encode())
+            f.write(b'</vertices><triangles>\n')
+            for block in _format_rows('<triangle v1="%d" v2="%d" v3="%d"/>\n', faces):
+                f.write(block.encode())
+            f.write(b'</triangles></mesh></object></resources>\n<build><item objectid="1"/></build>\n</model>\n')
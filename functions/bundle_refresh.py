@@ -0,0 +1,70 @@
+import bpy  # type: ignore
+import queue
+import threading
+
+class BundleRefresher:
+    """Rescans the bundles folder on a worker thread and hands the results back on Blender's main thread.
+
+    The worker only stats and parses files, LocalCache itself is only modified from the bpy.app.timers callback.
+    """
+
+    def __init__(self, poll_interval=0.2):
+        self.poll_interval = poll_interval
+        self.results = queue.Queue()
+        self.thread = None
+        self.pending = None
+
+    @property
+    def running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def request(self, cache, on_done):
+        # A scan requested while one is running is coalesced into a single follow-up scan
+        if self.running:
+            self.pending = (cache, on_done)
+            return
+
+        known_files = dict(cache.local_files)
+        self.thread = threading.Thread(target=self._scan, args=(cache, known_files, on_done), daemon=True)
+        self.thread.start()
+        if not bpy.app.timers.is_registered(self._poll):
+            bpy.app.timers.register(self._poll, first_interval=self.poll_interval)
+
+    def _scan(self, cache, known_files, on_done):
+        try:
+            current_files = cache.scan_files()
+            if current_files is None:
+                self.results.put((on_done, None, None))
+                return
+
+            modified, deleted = cache.changed_files(current_files, known_files)
+            if not modified and not deleted:
+                self.results.put((on_done, None, None))
+                return
+
+            self.results.put((on_done, current_files, cache.parse_files(modified)))
+        except Exception as e:
+            print(f"Background bundle scan failed: {e}")
+            self.results.put((on_done, None, None))
+
+    def _poll(self):
+        while not self.results.empty():
+            on_done, current_files, parsed_files = self.results.get()
+            if current_files is not None:
+                on_done(current_files, parsed_files)
+
+        if self.running:
+            return self.poll_interval
+
+        if self.pending:
+            cache, on_done = self.pending
+            self.pending = None
+            self.request(cache, on_done)
+            return self.poll_interval
+
+        return None
+
+    def stop(self):
+        self.pending = None
+        if bpy.app.timers.is_registered(self._poll):
+            bpy.app.timers.unregister(self._poll)
@@ -0,0 +1,180 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+INDEX_VERSION = 1
+TEMP_PREFIX = ".tmp-"
+STALE_TEMP_AGE = 24 * 60 * 60  # Temp copies older than this were left behind by a crashed process
+_thread_lock = threading.Lock()  # File locks don't reliably exclude threads of the same process on every platform
+
+def default_cache_directory():
+    return os.path.join(tempfile.gettempdir(), "unexpectedslicer_gcode_cache")
+
+class GcodeCache:
+    """Content-addressed store of sliced gcode, shared between Blender sessions, batch jobs and headless runs.
+
+    Every index update happens under an exclusive lock on index.lock and re-reads the index first, so concurrent
+    processes merge their changes instead of overwriting each other. Gcode files only get their final name while
+    the lock is held, so every such file has an index entry. Read hits don't rewrite the index, they touch the
+    gcode file and eviction goes by whichever of the two timestamps is newer.
+    """
+
+    def __init__(self, directory=None, max_bytes=1024 * 1024 * 1024):
+        self.directory = os.path.abspath(os.path.expanduser(directory or default_cache_directory()))
+        self.max_bytes = max_bytes
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, "index.json")
+
+    @property
+    def lock_path(self):
+        return os.path.join(self.directory, "index.lock")
+
+    @staticmethod
+    def make_key(geometry_hash, config_hash, slicer_version):
+        return hashlib.blake2b(f"{geometry_hash}|{config_hash}|{slicer_version}".encode(), digest_size=16).hexdigest()
+
+    def get(self, key):
+        entry = self._load_index()['entries'].get(key)
+        if not entry:
+            return None
+
+        path = os.path.join(self.directory, entry['file'])
+        try:
+            os.utime(path)  # Records the access for eviction without rewriting the index
+        except OSError:
+            with self._locked():
+                index = self._load_index()
+                if index['entries'].get(key, {}).get('file') == entry['file'] and not os.path.exists(path):
+                    del index['entries'][key]
+                    self._save_index(index)
+            return None
+
+        return dict(entry, path=path)
+
+    def put(self, key, gcode_path, stats=None):
+        if not os.path.exists(gcode_path):
+            return None
+
+        size = os.path.getsize(gcode_path)
+        if size > self.max_bytes:
+            return None
+
+        os.makedirs(self.directory, exist_ok=True)
+        extension = os.path.splitext(gcode_path)[1]
+        file_name = f"{key}{extension}"
+
+        # The slow copy goes to a private temp name, only the rename happens under the lock
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=TEMP_PREFIX, suffix=extension)
+        os.close(fd)
+        try:
+            shutil.copyfile(gcode_path, temp_path)
+            with self._locked():
+                os.replace(temp_path, os.path.join(self.directory, file_name))
+                index = self._load_index()
+                index['entries'][key] = {
+                    'file': file_name,
+                    'size': size,
+                    'last_used': time.time(),
+                    'stats': stats or {},
+                }
+                self._evict(index)
+                self._remove_orphans(index)
+                self._save_index(index)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return os.path.join(self.directory, file_name)
+
+    def clear(self):
+        with self._locked():
+            index = self._load_index()
+            for entry in index['entries'].values():
+                self._remove_file(entry['file'])
+            index['entries'] = {}
+            self._save_index(index)
+
+    def _last_used(self, entry):
+        try:
+            return max(entry['last_used'], os.path.getmtime(os.path.join(self.directory, entry['file'])))
+        except OSError:
+            return entry['last_used']
+
+    def _evict(self, index):
+        entries = index['entries']
+        total = sum(entry['size'] for entry in entries.values())
+        for key in sorted(entries, key=lambda k: self._last_used(entries[k])):
+            if total <= self.max_bytes:
+                break
+            total -= entries[key]['size']
+            self._remove_file(entries.pop(key)['file'])
+
+    def _remove_orphans(self, index):
+        # Files without an index entry, e.g. from an index that was lost or a process killed mid-copy
+        indexed = {entry['file'] for entry in index['entries'].values()}
+        now = time.time()
+        for file_name in os.listdir(self.directory):
+            path = os.path.join(self.directory, file_name)
+            if file_name in indexed or file_name in (os.path.basename(self.index_path), os.path.basename(self.lock_path)):
+                continue
+            if file_name.startswith(TEMP_PREFIX):
+                try:
+                    if now - os.path.getmtime(path) < STALE_TEMP_AGE:
+                        continue  # Possibly another process still copying
+                except OSError:
+                    continue
+            self._remove_file(file_name)
+
+    def _remove_file(self, file_name):
+        try:
+            os.remove(os.path.join(self.directory, file_name))
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with _thread_lock, open(self.lock_path, 'a+b') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r') as file:
+                index = json.load(file)
+            if index.get('version') == INDEX_VERSION:
+                return index
+        except (FileNotFoundError, ValueError):
+            pass
+        return {'version': INDEX_VERSION, 'entries': {}}
+
+    def _save_index(self, index):
+        os.makedirs(self.directory, exist_ok=True)
+        # Write then rename so a concurrent reader never sees a partial index
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=TEMP_PREFIX, suffix=".json")
+        with os.fdopen(fd, 'w') as file:
+            json.dump(index, file)
+        os.replace(tmp_path, self.index_path)
@@ -1,73 +1,248 @@
 import os
-import re
-from configparser import ConfigParser, MissingSectionHeaderError
+import sys
+import site
+import pickle
+import importlib.util
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from .ini_parser import read_ini_file, parse_section
 from .. import ADDON_FOLDER
 
+WORKER_MODULE = "ini_parser"
+WORKER_MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{WORKER_MODULE}.py")
+
+def worker_read_ini_file():
+    """Returns read_ini_file of ini_parser loaded as a top-level module, None when that name is taken.
+
+    Pool workers unpickle the function by module name. As a submodule of the add-on, a spawned worker would
+    have to import the add-on package and with it bpy, which Blender's interpreter can't import outside of Blender.
+    """
+    module = sys.modules.get(WORKER_MODULE)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(WORKER_MODULE, WORKER_MODULE_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules[WORKER_MODULE] = module
+    elif os.path.abspath(getattr(module, '__file__', '')) != WORKER_MODULE_PATH:
+        return None
+    return module.read_ini_file
+
+INDEX_VERSION = 2
+
 class LocalCache:
-    def __init__(self):
+    def __init__(self, lazy=False, max_lazy_sections=512, workers=1):
         self.directory = None
+        self.workers = workers  # Processes used to parse changed files, 0 uses every CPU
+        self.lazy = lazy  # Only scan section names and offsets, parse bodies on first use
+        self.max_lazy_sections = max_lazy_sections
+        self._lazy_sections = OrderedDict()  # Section key -> parsed body, least recently used first
+        self._lazy_keys_counted = {}  # Lazy section key -> setting keys it added to key_counts
         self.local_files = {}
         self.config_headers = {}
+        self.path_index = {}  # File path -> section keys it defines
+        self.category_index = {}  # Category -> section keys
+        self.key_counts = {}  # Setting key -> number of sections defining it, for the override search
+        self.version = 0  # Incremented whenever sections are added or removed
+        self.resolved_configs = {}  # Flattened profiles with inheritance applied
+        self._resolved_dependencies = {}  # Resolved key -> section keys it was flattened from
+        self._resolved_dependents = {}  # Section key -> resolved keys that inherit from it
         self._has_changes = False  # Flag to indicate changes in files
 
-    def _process_ini_to_cache_dict(self, path):
-        # Read the file content from the path
-        with open(path, 'r') as file:
-            content = file.read()
+    def resolve_config(self, key):
+        """Returns the profile with its whole inheritance chain merged, flattening it once and memoizing it."""
+        if key in self.resolved_configs:
+            return self.resolved_configs[key]
+
+        conf_current = self.get_conf_dict(key)
+        dependencies = {key}
+        merged_conf = {}
+        if conf_current.get('inherits', False):
+            curr_category = key.split(":")[0]
+            for inherit_id in conf_current['inherits'].split(';'):
+                inherit_key = curr_category + ":" + inherit_id.strip()
+                # Missing parents are tracked too, so adding them later invalidates this profile
+                dependencies.add(inherit_key)
+                if inherit_key in self.config_headers:
+                    merged_conf.update(self.resolve_config(inherit_key))
+                    dependencies.update(self._resolved_dependencies[inherit_key])
+        merged_conf.update(conf_current)
+        merged_conf.pop('inherits', None)
+        merged_conf.pop('compatible_printers_condition', None)
+
+        self.resolved_configs[key] = merged_conf
+        self._resolved_dependencies[key] = dependencies
+        for dependency in dependencies:
+            self._resolved_dependents.setdefault(dependency, set()).add(key)
+        return merged_conf
 
-        config = ConfigParser(interpolation=None)
+    def get_conf_dict(self, key):
+        """Returns the raw key/value body of a section, parsing it on demand for lazily scanned files."""
+        header = self.config_headers[key]
+        if header['conf_dict'] is not None:
+            return header['conf_dict']
+
+        # Offsets are only valid for the file as it was scanned, an edited file is rescanned first
+        if self._file_changed(header['path']):
+            self._rescan_file(header['path'])
+            if key not in self.config_headers:
+                raise ValueError(f"Section {key} is no longer defined in {header['path']}")
+            header = self.config_headers[key]
+            if header['conf_dict'] is not None:
+                return header['conf_dict']
+
+        if key in self._lazy_sections:
+            self._lazy_sections.move_to_end(key)
+            return self._lazy_sections[key]
+
+        conf_dict = parse_section(header['path'], key, header['offset'])
+        if conf_dict is None:
+            # The file changed between the stat and the read, rescan it and retry once
+            self._rescan_file(header['path'])
+            if key not in self.config_headers:
+                raise ValueError(f"Section {key} is no longer defined in {header['path']}")
+            header = self.config_headers[key]
+            if header['conf_dict'] is not None:
+                return header['conf_dict']
+            conf_dict = parse_section(header['path'], key, header['offset'])
+            if conf_dict is None:
+                raise ValueError(f"Unable to read section {key} from {header['path']}")
+
+        if key not in self._lazy_keys_counted:
+            self._lazy_keys_counted[key] = tuple(conf_dict)
+            self._count_keys(conf_dict, 1)
+            self.version += 1
+        self._lazy_sections[key] = conf_dict
+        while len(self._lazy_sections) > self.max_lazy_sections:
+            self._lazy_sections.popitem(last=False)
+        return conf_dict
+
+    def _file_changed(self, file_path):
+        file_info = self.local_files.get(file_path)
         try:
-            # Attempt to parse the content
-            config.read_string(content)
-            has_header = True
-        except MissingSectionHeaderError:
-            # Determine category based on specific IDs in the content
-            if re.search(r'^filament_settings_id', content, re.MULTILINE):
-                cat = 'filament'
-            elif re.search(r'^print_settings_id', content, re.MULTILINE):
-                cat = 'print'
-            elif re.search(r'^printer_settings_id', content, re.MULTILINE):
-                cat = 'printer'
-            else:
-                raise ValueError(f"Unable to determine category for the INI file: {path}")
-
-            # Extract the filename without extension
-            name = os.path.splitext(os.path.basename(path))[0]
-            # Create a default section with the determined category and name
-            default_section = f"[{cat}:{name}]\n" + content
-            config.read_string(default_section)
-            has_header = False
-
-        # Convert ConfigParser content into a dictionary
-        ini_dict = {
-            section: dict(sorted(config.items(section)))
-            for section in sorted(config.sections())
-        }
+            stat = os.stat(file_path)
+        except OSError:
+            return True
+        return file_info is None or stat.st_mtime != file_info['last_updated'] or stat.st_size != file_info.get('size')
+
+    def _rescan_file(self, file_path):
+        """Reparses a single file and records its new stat, so the next folder scan doesn't parse it again."""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            self._invalidate_resolved(self._remove_file_sections(file_path))
+            self.local_files.pop(file_path, None)
+            self.version += 1
+            return
+        self.local_files[file_path] = {'last_updated': stat.st_mtime, 'size': stat.st_size, 'updated': True}
+        self.process_all_files()
+
+    def _invalidate_resolved(self, changed_keys):
+        for changed_key in changed_keys:
+            self._lazy_sections.pop(changed_key, None)
+            for dependent in self._resolved_dependents.pop(changed_key, ()):
+                self.resolved_configs.pop(dependent, None)
+                self._resolved_dependencies.pop(dependent, None)
+
+    def _process_ini_to_cache_dict(self, path, parsed=None):
+        ini_dict, has_header, section_offsets = parsed or read_ini_file(path, self.lazy)
 
         # Flatten the dictionary for profiles and add to self.config_headers
         for key, val in ini_dict.items():
             if ":" in key:
+                self._remove_section(key)
                 self.config_headers[key] = {
                     'id': key.split(':')[1] if len(key.split(':')) > 1 else key,
                     'category': key.split(':')[0] if len(key.split(':')) > 1 else None,
                     'path': path,
                     'has_header': has_header,
                     'conf_dict': val,
+                    'offset': section_offsets[key] if section_offsets is not None else None,
                 }
+                self._index_section(key)
 
-    def process_all_files(self):
+    def _index_section(self, key):
+        header = self.config_headers[key]
+        self.path_index.setdefault(header['path'], set()).add(key)
+        self.category_index.setdefault(header['category'], set()).add(key)
+        self._count_keys(header['conf_dict'], 1)
+
+    def _remove_section(self, key):
+        header = self.config_headers.pop(key, None)
+        if header is None:
+            return
+        self.path_index.get(header['path'], set()).discard(key)
+        self.category_index.get(header['category'], set()).discard(key)
+        self._count_keys(header['conf_dict'] or self._lazy_keys_counted.pop(key, ()), -1)
+
+    def _remove_file_sections(self, file_path):
+        """Removes every section defined by a file and returns their keys."""
+        keys_to_remove = self.path_index.pop(file_path, set())
+        for key in keys_to_remove:
+            header = self.config_headers.pop(key)
+            self.category_index.get(header['category'], set()).discard(key)
+            self._count_keys(header['conf_dict'] or self._lazy_keys_counted.pop(key, ()), -1)
+        return keys_to_remove
+
+    def _count_keys(self, conf_dict, delta):
+        # Lazily scanned sections contribute their keys once their body is parsed
+        for setting_key in conf_dict or ():
+            count = self.key_counts.get(setting_key, 0) + delta
+            if count > 0:
+                self.key_counts[setting_key] = count
+            else:
+                self.key_counts.pop(setting_key, None)
+
+    def profile_keys(self):
+        return self.key_counts.keys()
+
+    def keys_in_category(self, category):
+        return self.category_index.get(category, set())
+
+    def _parse_in_parallel(self, file_paths):
+        """Parses files across a process pool, returns None when the pool can't be used."""
+        workers = self.workers or os.cpu_count() or 1
+        if workers < 2 or len(file_paths) < 2:
+            return None
+
+        workers = min(workers, len(file_paths))
+        try:
+            worker_function = worker_read_ini_file()
+            if worker_function is None:
+                raise ImportError(f"Another module is already loaded as '{WORKER_MODULE}'")
+            # Spawned workers find the parser through their path instead of importing the add-on
+            with ProcessPoolExecutor(max_workers=workers, initializer=site.addsitedir, initargs=(os.path.dirname(WORKER_MODULE_PATH),)) as executor:
+                chunksize = max(1, len(file_paths) // (workers * 4))
+                results = executor.map(worker_function, file_paths, [self.lazy] * len(file_paths), chunksize=chunksize)
+                return dict(zip(file_paths, results))
+        except (OSError, RuntimeError, ImportError, AttributeError, pickle.PicklingError) as e:
+            print(f"Parallel bundle scan unavailable, parsing serially: {e}")
+            return None
+
+    def parse_files(self, file_paths):
+        """Parses files without touching the cache, so it can run off the main thread."""
+        parsed_files = self._parse_in_parallel(file_paths)
+        if parsed_files is None:
+            parsed_files = {file_path: read_ini_file(file_path, self.lazy) for file_path in file_paths}
+        return parsed_files
+
+    def process_all_files(self, parsed_files=None):
         """Processes updated or new files and updates self.config_headers."""
-        for file_path, file_info in self.local_files.items():
-            if file_info['updated']:
-                # Remove existing entries associated with this file
-                keys_to_remove = [key for key, val in self.config_headers.items() if val['path'] == file_path]
-                for key in keys_to_remove:
-                    del self.config_headers[key]
-                self._process_ini_to_cache_dict(file_path)
-                # Mark the file as processed
-                self.local_files[file_path]['updated'] = False
-
-    def load_ini_files(self):
+        updated_files = [file_path for file_path, file_info in self.local_files.items() if file_info['updated']]
+        if parsed_files is None:
+            parsed_files = self._parse_in_parallel(updated_files) or {}
+
+        for file_path in updated_files:
+            # Remove existing entries associated with this file
+            keys_to_remove = self._remove_file_sections(file_path)
+            self._process_ini_to_cache_dict(file_path, parsed_files.get(file_path))
+            added_keys = self.path_index.get(file_path, set())
+            self._invalidate_resolved(keys_to_remove | added_keys)
+            self.version += 1
+            # Mark the file as processed
+            self.local_files[file_path]['updated'] = False
+
+    def scan_files(self):
+        """Returns {path: (mtime, size)} for every .ini file in the directory, None if it isn't a valid directory."""
         # Sanitize and normalize the path
         sanitized_path = os.path.abspath(os.path.expanduser(self.directory))
 
@@ -79,7 +254,7 @@ class LocalCache:
         # Verify if the path exists and is a directory
         if not os.path.isdir(sanitized_path):
             print(f"Error: {sanitized_path} is not a valid directory.")
-            return
+            return None
 
         # List all .ini files in the directory and subdirectories
         current_files = {}
@@ -87,27 +262,48 @@ class LocalCache:
             for file in files:
                 if file.endswith('.ini'):
                     file_path = os.path.join(root, file)
-                    last_modified = os.path.getmtime(file_path)
-                    current_files[file_path] = last_modified
+                    stat = os.stat(file_path)
+                    current_files[file_path] = (stat.st_mtime, stat.st_size)
+        return current_files
+
+    @staticmethod
+    def changed_files(current_files, known_files):
+        """Returns the new or modified paths and the deleted paths of a scan compared to known local_files."""
+        modified = [
+            file_path for file_path, (last_modified, size) in current_files.items()
+            if file_path not in known_files
+            or last_modified != known_files[file_path]['last_updated']
+            or size != known_files[file_path].get('size')
+        ]
+        deleted = [file_path for file_path in known_files if file_path not in current_files]
+        return modified, deleted
+
+    def load_ini_files(self, current_files=None):
+        if current_files is None:
+            current_files = self.scan_files()
+        if current_files is None:
+            return
 
         # Determine files that are new or updated
         updated_local_files = {}
         self._has_changes = False  # Reset the change flag
 
-        for file_path, last_modified in current_files.items():
+        for file_path, (last_modified, size) in current_files.items():
             if file_path in self.local_files:
-                prev_last_modified = self.local_files[file_path]['last_updated']
-                is_updated = last_modified > prev_last_modified
+                prev_file = self.local_files[file_path]
+                is_updated = last_modified != prev_file['last_updated'] or size != prev_file.get('size')
                 if is_updated:
                     self._has_changes = True
                 updated_local_files[file_path] = {
                     'last_updated': last_modified,
+                    'size': size,
                     'updated': is_updated
                 }
             else:
                 # New file detected
                 updated_local_files[file_path] = {
                     'last_updated': last_modified,
+                    'size': size,
                     'updated': True
                 }
                 self._has_changes = True
@@ -118,13 +314,56 @@ class LocalCache:
             self._has_changes = True
             # Remove entries associated with deleted files
             for deleted_file in deleted_files:
-                keys_to_remove = [key for key, val in self.config_headers.items() if val['path'] == deleted_file]
-                for key in keys_to_remove:
-                    del self.config_headers[key]
+                self._invalidate_resolved(self._remove_file_sections(deleted_file))
+                self.version += 1
 
         # Update local_files with the current state
         self.local_files = updated_local_files
 
+    def clear(self):
+        self.local_files = {}
+        self.config_headers = {}
+        self.path_index = {}
+        self.category_index = {}
+        self.key_counts = {}
+        self._lazy_keys_counted = {}
+        self.version += 1
+        self.resolved_configs = {}
+        self._resolved_dependencies = {}
+        self._resolved_dependents = {}
+        self._lazy_sections.clear()
+
+    def load_index(self, index_path):
+        """Restores local_files and config_headers from a previous session, returns True on success."""
+        try:
+            with open(index_path, 'rb') as file:
+                index = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return False
+
+        if not isinstance(index, dict) or index.get('version') != INDEX_VERSION or index.get('lazy') != self.lazy:
+            return False
+
+        self.clear()
+        self.local_files = index['local_files']
+        self.config_headers = index['config_headers']
+        for key in self.config_headers:
+            self._index_section(key)
+        return True
+
+    def save_index(self, index_path):
+        index = {
+            'version': INDEX_VERSION,
+            'lazy': self.lazy,
+            'local_files': self.local_files,
+            'config_headers': self.config_headers,
+        }
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        temp_path = index_path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            pickle.dump(index, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, index_path)
+
     def has_changes(self):
         """Checks if any local_files have changed since the last update."""
         return self._has_changes
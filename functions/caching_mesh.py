@@ -0,0 +1,91 @@
+import bpy  # type: ignore
+from bpy.app.handlers import persistent  # type: ignore
+from collections import OrderedDict
+
+class MeshCache:
+    def __init__(self, max_bytes=512 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.geometry_versions = {}
+        self.frame_version = 0  # Deformation at a new frame keeps counts and matrices, so frame changes invalidate everything
+        self.current_bytes = 0
+
+    def object_key(self, obj, kind, scale):
+        # obj is the evaluated object, versions are tracked on the original datablocks
+        original = obj.original
+        mesh = obj.data
+        return (
+            kind,
+            scale,
+            self.frame_version,
+            original.name,
+            original.data.as_pointer() if original.data else 0,
+            self.geometry_versions.get(('OBJECT', original.name), 0),
+            self.geometry_versions.get(('MESH', original.data.name), 0) if original.data else 0,
+            len(mesh.vertices),
+            len(mesh.loop_triangles),
+            tuple(v for row in obj.matrix_world for v in row),
+        )
+
+    def get(self, key):
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value):
+        size = sum(a.nbytes for a in value) if isinstance(value, tuple) else value.nbytes
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = value
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+
+    def get_or_build(self, obj, kind, scale, builder):
+        key = self.object_key(obj, kind, scale)
+        value = self.get(key)
+        if value is None:
+            value = builder()
+            self.put(key, value)
+        return value
+
+    def set_budget(self, max_bytes):
+        self.max_bytes = max_bytes
+        while self.entries and self.current_bytes > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+
+    def clear(self):
+        self.entries.clear()
+        self.current_bytes = 0
+
+    def _remove(self, key):
+        value = self.entries.pop(key)
+        self.current_bytes -= sum(a.nbytes for a in value) if isinstance(value, tuple) else value.nbytes
+
+    @persistent
+    def on_depsgraph_update(self, scene, depsgraph):
+        for update in depsgraph.updates:
+            if not update.is_updated_geometry:
+                continue
+            datablock = update.id.original
+            if isinstance(datablock, bpy.types.Object):
+                key = ('OBJECT', datablock.name)
+            elif isinstance(datablock, bpy.types.Mesh):
+                key = ('MESH', datablock.name)
+            else:
+                continue
+            self.geometry_versions[key] = self.geometry_versions.get(key, 0) + 1
+
+    @persistent
+    def on_frame_change(self, *args):
+        # Armatures, shape keys and animated modifiers deform meshes without a geometry update being reported
+        self.frame_version += 1
+
+    @persistent
+    def on_reset(self, *args):
+        # Datablock pointers are not stable across file loads and undo steps
+        self.clear()
+        self.geometry_versions.clear()
@@ -1,19 +1,144 @@
+import os
 import re
+import zlib
+import struct
+
+STAT_PATTERN = re.compile(rb'^; ?([^=]+?) ?= ?(.*)$')
+CONFIG_BLOCK_BEGIN = b'; prusaslicer_config = begin'
+CONFIG_BLOCK_END = b'; prusaslicer_config = end'
+
+def read_lines_reversed(file_path, block_size=1 << 16):
+    # Yields the lines of a file from last to first, reading fixed-size blocks from the end
+    with open(file_path, 'rb') as file:
+        file.seek(0, os.SEEK_END)
+        position = file.tell()
+        remainder = b''
+        while position > 0:
+            read_size = min(block_size, position)
+            position -= read_size
+            file.seek(position)
+            lines = (file.read(read_size) + remainder).split(b'\n')
+            remainder = lines[0]
+            for line in reversed(lines[1:]):
+                yield line.rstrip(b'\r')
+        yield remainder.rstrip(b'\r')
 
 def parse_gcode(file_path, name):
-    val = None
     pattern = re.compile(rb'^;? ?' + name.encode('utf-8') + rb' ?= ?(.+)$')
-    with open(file_path, 'rb') as file:  # Open in binary mode
-        lines = file.readlines()[::-1] # Read all lines and reverse the order
-        for line in lines:
-            try:
-                val = pattern.search(line)
-                if val:
-                    return val.group(1).decode()
-            except UnicodeDecodeError:
-                continue
+    for line in read_lines_reversed(file_path):
+        try:
+            val = pattern.search(line)
+            if val:
+                return val.group(1).decode()
+        except UnicodeDecodeError:
+            continue
     return None
 
+def parse_gcode_stats(file_path, keys=None):
+    """Collects the summary statistics PrusaSlicer writes at the end of the gcode in a single backwards pass."""
+    stats = {}
+    in_config_block = False
+    for line in read_lines_reversed(file_path):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(CONFIG_BLOCK_END):
+            in_config_block = True
+            continue
+        if line.startswith(CONFIG_BLOCK_BEGIN):
+            in_config_block = False
+            continue
+        if in_config_block:
+            continue
+        if not line.startswith(b';'):
+            # The statistics block ends at the first gcode command above it
+            break
+
+        match = STAT_PATTERN.match(line)
+        if match:
+            stats.setdefault(match.group(1).decode('utf-8', errors='replace'), match.group(2).decode('utf-8', errors='replace'))
+        if keys and all(key in stats for key in keys):
+            break
+    return stats
+
+BGCODE_MAGIC = b'GCDE'
+BGCODE_FILE_HEADER = struct.Struct('<4sIH')
+BGCODE_BLOCK_HEADER = struct.Struct('<HHI')
+BGCODE_CHECKSUM_SIZES = {0: 0, 1: 4}
+BGCODE_BLOCK_TYPES = {
+    0: 'file_metadata',
+    1: 'gcode',
+    2: 'slicer_metadata',
+    3: 'printer_metadata',
+    4: 'print_metadata',
+    5: 'thumbnail',
+}
+BGCODE_METADATA_BLOCKS = {'file_metadata', 'slicer_metadata', 'printer_metadata', 'print_metadata'}
+
+def is_bgcode(file_path):
+    with open(file_path, 'rb') as file:
+        return file.read(len(BGCODE_MAGIC)) == BGCODE_MAGIC
+
+def parse_bgcode_metadata(file_path, block_names=('printer_metadata', 'print_metadata')):
+    """Reads the INI-encoded metadata blocks of a binary gcode file, seeking past the gcode and thumbnail blocks."""
+    metadata = {}
+    with open(file_path, 'rb') as file:
+        header = file.read(BGCODE_FILE_HEADER.size)
+        if len(header) < BGCODE_FILE_HEADER.size:
+            raise ValueError(f"Truncated binary gcode header: {file_path}")
+        magic, _, checksum_type = BGCODE_FILE_HEADER.unpack(header)
+        if magic != BGCODE_MAGIC:
+            raise ValueError(f"Not a binary gcode file: {file_path}")
+        checksum_size = BGCODE_CHECKSUM_SIZES.get(checksum_type)
+        if checksum_size is None:
+            raise ValueError(f"Unsupported binary gcode checksum type {checksum_type}: {file_path}")
+
+        # A truncated or corrupt file surfaces as ValueError like every other parse failure
+        try:
+            while not all(name in metadata for name in block_names):
+                block_header = file.read(BGCODE_BLOCK_HEADER.size)
+                if not block_header:
+                    break
+                if len(block_header) < BGCODE_BLOCK_HEADER.size:
+                    raise ValueError(f"Truncated binary gcode block: {file_path}")
+                block_type, compression, uncompressed_size = BGCODE_BLOCK_HEADER.unpack(block_header)
+                data_size = struct.unpack('<I', file.read(4))[0] if compression else uncompressed_size
+                params_size = 6 if BGCODE_BLOCK_TYPES.get(block_type) == 'thumbnail' else 2
+
+                block_name = BGCODE_BLOCK_TYPES.get(block_type)
+                # Only uncompressed and deflate metadata can be decoded without heatshrink
+                if block_name not in block_names or block_name not in BGCODE_METADATA_BLOCKS or compression not in (0, 1):
+                    file.seek(params_size + data_size + checksum_size, os.SEEK_CUR)
+                    continue
+
+                encoding = struct.unpack('<H', file.read(2))[0]
+                data = file.read(data_size)
+                if len(data) < data_size:
+                    raise ValueError(f"Truncated binary gcode block: {file_path}")
+                file.seek(checksum_size, os.SEEK_CUR)
+                if compression == 1:
+                    data = zlib.decompress(data)
+                if encoding != 0:
+                    continue
+
+                block = metadata.setdefault(block_name, {})
+                for line in data.decode('utf-8', errors='replace').splitlines():
+                    if '=' in line:
+                        key, value = line.split('=', 1)
+                        block.setdefault(key.strip(), value.strip())
+        except (struct.error, zlib.error) as e:
+            raise ValueError(f"Corrupt binary gcode file {file_path}: {e}") from e
+    return metadata
+
+def parse_bgcode_stats(file_path):
+    metadata = parse_bgcode_metadata(file_path)
+    return {**metadata.get('printer_metadata', {}), **metadata.get('print_metadata', {})}
+
+def get_gcode_stats(file_path, keys=None):
+    if is_bgcode(file_path):
+        return parse_bgcode_stats(file_path)
+    return parse_gcode_stats(file_path, keys)
+
 def get_bed_size(bed_shape: str) -> tuple:
     try:
         # Split the string by commas to get each coordinate
@@ -0,0 +1,120 @@
+# Pool workers load this file as a top-level module, so it must not import from the add-on package
+import os
+
+HEADERLESS_CATEGORY_KEYS = [
+    ('filament_settings_id', 'filament'),
+    ('print_settings_id', 'print'),
+    ('printer_settings_id', 'printer'),
+]
+
+def _parse_lines(lines):
+    # Returns the keys found before the first section header and the sections, both in file order
+    sections = {}
+    headerless = {}
+    target = headerless
+    last_key = None
+    pending_blank_lines = 0
+
+    for line in lines:
+        stripped = line.strip()
+        if not stripped:
+            pending_blank_lines += 1
+            continue
+
+        if stripped[0] in '#;':
+            continue
+
+        if line[0] in ' \t' and last_key is not None:
+            # Indented lines continue the previous value, as ConfigParser does for multi-line values
+            target[last_key] += '\n' * (pending_blank_lines + 1) + stripped
+            pending_blank_lines = 0
+            continue
+
+        pending_blank_lines = 0
+
+        if stripped[0] == '[':
+            section = stripped[1:stripped.rfind(']')]
+            target = sections.setdefault(section, {})
+            last_key = None
+            continue
+
+        key, separator, value = stripped.partition('=')
+        if not separator:
+            last_key = None
+            continue
+
+        last_key = key.strip().lower()
+        target[last_key] = value.strip()
+
+    return headerless, sections
+
+def parse_ini(path):
+    """Parses a PrusaSlicer bundle or exported config in a single pass.
+
+    Returns the sections in file order and whether the file had its own section headers. Keys found before
+    the first header (exported configs) are put in a "<category>:<file name>" section, the category being
+    inferred from the *_settings_id key they contain.
+    """
+    with open(path, 'r') as file:
+        headerless, sections = _parse_lines(file)
+
+    if not headerless:
+        return sections, True
+
+    for key, category in HEADERLESS_CATEGORY_KEYS:
+        if key in headerless:
+            break
+    else:
+        raise ValueError(f"Unable to determine category for the INI file: {path}")
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    return {f"{category}:{name}": headerless, **sections}, False
+
+def scan_sections(path):
+    """Records the byte range of every section without parsing the bodies.
+
+    Returns None for files with keys before the first header, which have to go through parse_ini.
+    """
+    sections = {}
+    current, start = None, 0
+    offset = 0
+
+    with open(path, 'rb') as file:
+        for line in file:
+            stripped = line.strip()
+            if stripped.startswith(b'['):
+                if current is not None:
+                    sections[current] = (start, offset)
+                current = stripped[1:stripped.rfind(b']')].decode('utf-8', errors='replace')
+                start = offset
+            elif current is None and stripped and stripped[:1] not in (b'#', b';') and b'=' in stripped:
+                return None
+            offset += len(line)
+
+    if current is not None:
+        sections[current] = (start, offset)
+    return sections
+
+def parse_section(path, section, byte_range):
+    """Parses the body of one section found by scan_sections, returns None if the file no longer matches the scan."""
+    start, end = byte_range
+    with open(path, 'rb') as file:
+        file.seek(start)
+        content = file.read(end - start).decode('utf-8', errors='replace')
+
+    _, sections = _parse_lines(content.splitlines())
+    if list(sections) != [section]:
+        return None
+    return sections[section]
+
+def read_ini_file(path, lazy=False):
+    """Parses a file for LocalCache, returns (sections, has_header, section_offsets).
+
+    In lazy mode the section bodies are None and section_offsets holds their byte ranges. Kept at module
+    level so it can be dispatched to worker processes.
+    """
+    section_offsets = scan_sections(path) if lazy else None
+    if section_offsets is not None:
+        return dict.fromkeys(section_offsets), True, section_offsets
+    sections, has_header = parse_ini(path)
+    return sections, has_header, None
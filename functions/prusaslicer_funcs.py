@@ -1,8 +1,16 @@
 
+import io
 import os
+import re
+import time
+import signal
 import tempfile
+import threading
 import subprocess
 
+if os.name != 'nt':
+    import pty
+
 temp_dir = tempfile.gettempdir()
 
 def exec_prusaslicer(command, prusaslicer_path):
@@ -39,6 +47,173 @@ def exec_prusaslicer(command, prusaslicer_path):
         tempfile = err_to_tempfile(result.stderr + "\n\n" + result.stdout)
         return f"Slicing failed, error log at {tempfile}."
     
+PROGRESS_PATTERN = re.compile(r'^\s*(\d+)%\s*=>\s*(.*)$')
+# First match wins, so keywords contained in others ('slicing') come after the longer phrases
+STAGE_PROGRESS = [
+    ('slicing result exported', 100, 'Gcode exported'),
+    ('exporting g-code', 90, 'Exporting gcode'),
+    ('processing triangulated mesh', 10, 'Slicing'),
+    ('perimeters', 20, 'Generating perimeters'),
+    ('infill', 45, 'Generating infill'),
+    ('support', 70, 'Generating support material'),
+    ('skirt', 80, 'Generating skirt and brim'),
+    ('slicing', 10, 'Slicing'),
+]
+
+def parse_progress_line(line):
+    """Maps a line of PrusaSlicer output to (percent, stage text), None for lines that aren't progress."""
+    match = PROGRESS_PATTERN.match(line)
+    if match:
+        return min(int(match.group(1)), 100), match.group(2).strip()
+    lower_line = line.lower()
+    if '[error]' in lower_line:
+        return None
+    for keyword, percent, text in STAGE_PROGRESS:
+        if keyword in lower_line:
+            return percent, text
+    return None
+
+def kill_process_group(process):
+    """Kills a process started in its own group along with every process it spawned."""
+    try:
+        if os.name == 'nt':
+            subprocess.run(['taskkill', '/T', '/F', '/PID', str(process.pid)], capture_output=True, creationflags=subprocess.CREATE_NO_WINDOW)
+        else:
+            os.killpg(process.pid, signal.SIGKILL)  # The group id is the pid with start_new_session
+    except OSError:
+        pass
+    if process.poll() is None:
+        process.kill()
+
+class SlicerJob:
+    """Runs PrusaSlicer in the background, streaming its output line by line.
+
+    A reader thread updates progress as lines arrive and calls on_finished(job) once the process exits,
+    from that same thread, so on_finished must not touch bpy data. Blender polls done/progress from a timer.
+    """
+
+    def __init__(self, command, prusaslicer_path):
+        if os.path.exists(prusaslicer_path):
+            self.command = [prusaslicer_path] + command
+        else:
+            self.command = prusaslicer_path.split() + command
+        self.process = None
+        self.stream = None  # PrusaSlicer's combined stdout and stderr, as text
+        self.output = []
+        self.progress = (0, 'Starting PrusaSlicer')
+        self.error = None
+        self.result = None
+        self.cancelled = False
+        self.start_time = None
+        self.done = threading.Event()
+
+    def start(self, on_finished=None):
+        print(f"Running command: {' '.join(self.command)}")
+        self.start_time = time.time()
+        # Its own process group, so cancel() also reaches helpers PrusaSlicer or its AppImage runtime spawned
+        if os.name == 'nt':
+            master_fd, slave_fd = None, subprocess.PIPE
+            group_args = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            # Through a pipe the C stdio of PrusaSlicer is fully buffered and the progress lines only arrive at exit,
+            # a pty makes it line buffered
+            master_fd, slave_fd = pty.openpty()
+            group_args = {'start_new_session': True}
+        try:
+            self.process = subprocess.Popen(self.command, stdout=slave_fd, stderr=subprocess.STDOUT, **group_args)
+        except OSError as e:
+            if master_fd is not None:
+                os.close(master_fd)
+            self.error = f"Failed to start PrusaSlicer: {e}"
+            self.done.set()
+            return self
+        finally:
+            if master_fd is not None:
+                os.close(slave_fd)
+
+        if master_fd is None:
+            self.stream = io.TextIOWrapper(self.process.stdout, errors='replace')
+        else:
+            self.stream = open(master_fd, 'r', errors='replace')
+
+        threading.Thread(target=self._read_output, args=(on_finished,), daemon=True).start()
+        return self
+
+    def cancel(self):
+        self.cancelled = True
+        if self.process and self.process.poll() is None:
+            kill_process_group(self.process)
+
+    def _read_output(self, on_finished):
+        try:
+            for line in self.stream:
+                line = line.rstrip()
+                self.output.append(line)
+                progress = parse_progress_line(line)
+                if progress:
+                    self.progress = progress
+        except OSError:
+            pass  # Linux reports the end of a pty's output as EIO once the last process writing to it exits
+        finally:
+            self.stream.close()
+        self.process.wait()
+
+        self.error = self._error_from_output()
+        try:
+            if on_finished:
+                self.result = on_finished(self)
+        except Exception as e:
+            self.error = self.error or f"Failed to process the sliced gcode: {e}"
+        finally:
+            self.done.set()
+
+    def _error_from_output(self):
+        if self.cancelled:
+            return "Cancelled"
+
+        output = "\n".join(self.output)
+        if self.process.returncode != 0:
+            if output:
+                print("PrusaSlicer error output:")
+                print(output)
+                return f"PrusaSlicer failed with error output: {output}"
+            return f"PrusaSlicer failed with return code {self.process.returncode}"
+
+        if not output:
+            return None
+
+        print("PrusaSlicer output:")
+        print(output)
+        for line in self.output:
+            if "[error]" in line.lower():
+                err_to_tempfile(output)
+                return line.lower().split("[error]", 1)[1].strip()
+            if "slicing result exported" in line.lower():
+                return None
+
+        return f"Slicing failed, error log at {err_to_tempfile(output)}."
+
+def get_prusaslicer_version(prusaslicer_path):
+    if not hasattr(get_prusaslicer_version, 'cache'):
+        get_prusaslicer_version.cache = {}
+
+    command = [prusaslicer_path] if os.path.exists(prusaslicer_path) else prusaslicer_path.split()
+    executable = command[0] if command else ''
+    mtime = os.path.getmtime(executable) if os.path.exists(executable) else 0
+    cache_key = (prusaslicer_path, mtime)
+
+    if cache_key not in get_prusaslicer_version.cache:
+        try:
+            result = subprocess.run(command + ['--help'], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, timeout=30)
+            match = re.search(r'PrusaSlicer-(\S+)', result.stdout)
+            version = match.group(1) if match else None
+        except (OSError, subprocess.SubprocessError):
+            version = None
+        # Fall back to the executable identity so a changed binary still invalidates cached results
+        get_prusaslicer_version.cache[cache_key] = version or f"{prusaslicer_path}@{mtime}"
+
+    return get_prusaslicer_version.cache[cache_key]
+
 def err_to_tempfile(text):
     temp_file_path = os.path.join(temp_dir, "prusa_slicer_err_output.txt")
     with open(temp_file_path, "w") as temp_file:
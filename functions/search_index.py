@@ -0,0 +1,142 @@
+import re
+import csv
+from bisect import bisect_left, insort
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+GRAM_SIZE = 3  # Longest n-gram indexed for substring lookups, shorter words are looked up directly
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+def ngrams(token, size):
+    return {token[i:i + size] for i in range(len(token) - size + 1)}
+
+class ParamSearchIndex:
+    """Inverted token index over (param_id, param_name, param_description) rows.
+
+    Every query word has to match a token of the row, exactly, as a prefix or as a substring, and rows are
+    ranked by how well their tokens match. Ties go to the row whose param id has the query words at the start
+    of its underscore-separated segments, the earliest such segment, and then the shortest name and id, so
+    "layer" finds layer_height before first_layer_height.
+    """
+
+    def __init__(self, rows=()):
+        self.rows = []  # Removed rows are left as None so row indices stay valid
+        self.row_ids = {}
+        self.postings = {}  # Token -> row indices
+        self.vocabulary = []  # Sorted tokens for prefix lookups
+        self.grams = {}  # N-gram of up to GRAM_SIZE characters -> tokens containing it, for substring lookups
+        for row in rows:
+            self.add(*row, sort_vocabulary=False)
+        self.vocabulary = sorted(self.postings)
+        self.static_ids = set(self.row_ids)  # Rows that came with the index, never removed by sync_keys
+
+    @classmethod
+    def from_csv(cls, path):
+        with open(path, 'r', newline='', encoding='utf-8-sig') as f:
+            return cls(tuple(row[:3]) for row in csv.reader(f) if len(row) >= 3)
+
+    def add(self, param_id, param_name, param_description, sort_vocabulary=True):
+        if param_id in self.row_ids:
+            return
+        row_index = len(self.rows)
+        self.rows.append((param_id, param_name, param_description))
+        self.row_ids[param_id] = row_index
+        for token in set(tokenize(f"{param_id} {param_name} {param_description}")):
+            if token not in self.postings:
+                self.postings[token] = set()
+                if sort_vocabulary:
+                    insort(self.vocabulary, token)
+                for size in range(1, GRAM_SIZE + 1):
+                    for gram in ngrams(token, size):
+                        self.grams.setdefault(gram, set()).add(token)
+            self.postings[token].add(row_index)
+
+    def remove(self, param_id):
+        row_index = self.row_ids.pop(param_id, None)
+        if row_index is None:
+            return
+        param_id, param_name, param_description = self.rows[row_index]
+        for token in set(tokenize(f"{param_id} {param_name} {param_description}")):
+            self.postings[token].discard(row_index)
+            if not self.postings[token]:
+                self._remove_token(token)
+        self.rows[row_index] = None
+
+    def sync_keys(self, keys):
+        """Adds the keys that aren't indexed yet and drops previously synced keys that are gone."""
+        for key in keys:
+            if key not in self.row_ids:
+                self.add(key, key.replace('_', ' ').capitalize(), "")
+        for key in [key for key in self.row_ids if key not in self.static_ids and key not in keys]:
+            self.remove(key)
+
+    def _remove_token(self, token):
+        del self.postings[token]
+        position = bisect_left(self.vocabulary, token)
+        if position < len(self.vocabulary) and self.vocabulary[position] == token:
+            del self.vocabulary[position]
+        for size in range(1, GRAM_SIZE + 1):
+            for gram in ngrams(token, size):
+                self.grams[gram].discard(token)
+                if not self.grams[gram]:
+                    del self.grams[gram]
+
+    def _substring_tokens(self, word):
+        if len(word) <= GRAM_SIZE:
+            return self.grams.get(word, set())
+        # Tokens holding every n-gram of the word are candidates, the check weeds out n-grams in another order
+        candidates = sorted((self.grams.get(gram, set()) for gram in ngrams(word, GRAM_SIZE)), key=len)
+        return {token for token in set.intersection(*candidates) if word in token}
+
+    def _match_word(self, word):
+        # Row index -> best score for this word: 3 exact, 2 prefix, 1 substring
+        scores = {}
+        for row_index in self.postings.get(word, ()):
+            scores[row_index] = 3
+
+        position = bisect_left(self.vocabulary, word)
+        while position < len(self.vocabulary) and self.vocabulary[position].startswith(word):
+            for row_index in self.postings[self.vocabulary[position]]:
+                scores.setdefault(row_index, 2)
+            position += 1
+
+        for token in self._substring_tokens(word):
+            if not token.startswith(word):
+                for row_index in self.postings[token]:
+                    scores.setdefault(row_index, 1)
+        return scores
+
+    def search(self, query, limit=50):
+        words = tokenize(query)
+        if not words:
+            return []
+
+        totals = None
+        for word in words:
+            scores = self._match_word(word)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {row_index: totals[row_index] + score for row_index, score in scores.items() if row_index in totals}
+            if not totals:
+                return []
+
+        def rank(row_index):
+            param_id, param_name, _ = self.rows[row_index]
+            segments = param_id.lower().split('_')
+            boundary_positions = [
+                next((position for position, segment in enumerate(segments) if segment.startswith(word)), None)
+                for word in words
+            ]
+            boundary_matches = [position for position in boundary_positions if position is not None]
+            return (
+                -totals[row_index],
+                -len(boundary_matches),
+                min(boundary_matches, default=len(segments)),
+                len(tokenize(param_name)),
+                len(param_id),
+                param_id,
+            )
+
+        return [self.rows[row_index] for row_index in sorted(totals, key=rank)[:limit]]
@@ -0,0 +1,82 @@
+import csv
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+class SliceTimer:
+    """Wall-clock spans of the stages of one slice, filled from the operator and from the job's reader thread."""
+
+    def __init__(self):
+        self.start_time = time.time()
+        self.spans = []  # (stage, seconds) in the order the stages ran
+
+    @contextmanager
+    def span(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage, seconds):
+        self.spans.append((stage, seconds))
+
+    @property
+    def total(self):
+        return sum(seconds for _, seconds in self.spans)
+
+    def as_dict(self):
+        return {stage: round(seconds, 4) for stage, seconds in self.spans}
+
+class TimingHistory:
+    """Rolling per-collection history of slice timings."""
+
+    def __init__(self, max_entries=20):
+        self.max_entries = max_entries
+        self.entries = {}  # Collection name -> deque of records, oldest first
+        self.lock = threading.Lock()
+
+    def record(self, collection, timer, **info):
+        record = {
+            'timestamp': timer.start_time,
+            'total': round(timer.total, 4),
+            'spans': timer.as_dict(),
+            **info,
+        }
+        with self.lock:
+            self.entries.setdefault(collection, deque(maxlen=self.max_entries)).append(record)
+        return record
+
+    def get(self, collection):
+        with self.lock:
+            return list(self.entries.get(collection, ()))
+
+    def last(self, collection):
+        records = self.get(collection)
+        return records[-1] if records else None
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def to_dict(self):
+        with self.lock:
+            return {collection: list(records) for collection, records in self.entries.items()}
+
+    def write_json(self, path):
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def write_csv(self, path):
+        # One row per stage, so the file can be pivoted by collection, run or stage
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['collection', 'timestamp', 'mode', 'result', 'stage', 'seconds'])
+            for collection, records in self.to_dict().items():
+                for record in records:
+                    for stage, seconds in record['spans'].items():
+                        writer.writerow([collection, record['timestamp'], record.get('mode', ''), record.get('result', ''), stage, seconds])
+
+timing_history = TimingHistory()
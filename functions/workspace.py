@@ -0,0 +1,46 @@
+import os
+import sys
+import shutil
+import tempfile
+
+RAM_TEMP_DIRS = ['/dev/shm']  # tmpfs mounts PrusaSlicer can open by path, memfds have no usable file name
+RAM_HEADROOM = 512 * 1024 * 1024  # Left free for the gcode, which is written into the same workspace
+
+def ram_temp_dir(required_bytes=0):
+    """Returns a RAM-backed folder with room for required_bytes, None when there isn't one."""
+    if not sys.platform.startswith('linux'):
+        return None
+    for folder in RAM_TEMP_DIRS:
+        if not os.path.isdir(folder) or not os.access(folder, os.W_OK | os.X_OK):
+            continue
+        try:
+            if shutil.disk_usage(folder).free < required_bytes + RAM_HEADROOM:
+                continue
+        except OSError:
+            continue
+        return folder
+    return None
+
+class SliceWorkspace:
+    """Private temp folder holding the model, config and gcode of one slice.
+
+    The folder is removed as a whole by cleanup(), which the owner calls once PrusaSlicer is done with it.
+    With use_ram the folder goes to a tmpfs such as /dev/shm when one has room, else to the system temp folder.
+    """
+
+    def __init__(self, use_ram=False, required_bytes=0, prefix="unexpectedslicer_"):
+        base = ram_temp_dir(required_bytes) if use_ram else None
+        self.in_ram = base is not None
+        self.path = tempfile.mkdtemp(prefix=prefix, dir=base)
+
+    def file(self, name):
+        return os.path.join(self.path, name)
+
+    def cleanup(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cleanup()
@@ -0,0 +1,124 @@
+import bpy # type: ignore
+
+import os, sys, json, time, argparse
+
+from .functions.batch_slicing import BatchSlicer
+from . import operators as op
+
+EXIT_FAILED = 1  # At least one collection failed, was cancelled or couldn't be sliced as requested
+EXIT_SKIPPED = 3  # Everything that was sliced succeeded, but some collections were skipped
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        prog="blender -b -P cli.py --",
+        description="Slice collections of .blend files with their UnexpectedSlicer settings, without the UI.",
+        epilog=f"Exits with {EXIT_FAILED} when a collection failed and with {EXIT_SKIPPED} when collections without a complete configuration or meshes of their own were skipped.",
+    )
+    parser.add_argument("blend_files", nargs='*', help=".blend files to slice, defaults to the file Blender was started with")
+    parser.add_argument("-c", "--collections", nargs='+', default=[], help="Collections to slice, defaults to every collection with a complete configuration")
+    parser.add_argument("-o", "--output", required=True, help="Folder receiving the gcode, in a subfolder named after each .blend file")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="PrusaSlicer processes run at once, defaults to the add-on preference")
+    parser.add_argument("--report", default=None, help="Path of the JSON report, printed to stdout when omitted")
+    return parser.parse_args(argv)
+
+def blend_output_dir(output_dir, blend_path, used_names):
+    """Returns the subfolder of output_dir for one .blend file, so files with alike parts never overwrite each other's gcode."""
+    stem = os.path.splitext(os.path.basename(blend_path))[0] or "untitled"
+    name, suffix = stem, 1
+    while name in used_names:
+        suffix += 1
+        name = f"{stem}-{suffix}"
+    used_names.add(name)
+    path = os.path.join(output_dir, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def slice_blend_file(blend_path, collection_names, output_dir, package, max_workers, used_names):
+    """Slices collections of the currently open (or given) .blend file, returns its report with timings."""
+    start_time = time.time()
+    if blend_path:
+        try:
+            bpy.ops.wm.open_mainfile(filepath=blend_path)
+        except RuntimeError as e:
+            return {
+                'blend_file': blend_path, 'error': str(e), 'jobs': [], 'total': 1, 'succeeded': 0, 'failed': 1, 'skipped': 0,
+                'timings': {'total': round(time.time() - start_time, 3)},
+            }
+    load_seconds = time.time() - start_time
+    prefs = bpy.context.preferences.addons[package].preferences
+    output_dir = blend_output_dir(output_dir, bpy.data.filepath, used_names)
+
+    scene = bpy.context.scene
+    batch = BatchSlicer(prefs.prusaslicer_path, max_workers)
+    if collection_names:
+        # Collections asked for by name fail when they can't be sliced, with the same criteria as the batch
+        collections = {cx.name: cx for cx in [scene.collection] + list(scene.collection.children_recursive)}
+        sliceable = []
+        for name in collection_names:
+            cx = collections.get(name)
+            issue = "Collection not found" if cx is None else op.collection_slice_issue(cx)
+            if issue:
+                batch.add_result(name, 'failed', issue)
+            else:
+                sliceable.append(cx)
+    else:
+        sliceable, skipped = op.sliceable_collections(scene)
+        for name, reason in skipped.items():
+            batch.add_result(name, 'skipped', reason)
+
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    for cx in sliceable:
+        op.submit_batch_job(batch, cx, depsgraph, prefs, output_dir)
+    prepare_seconds = time.time() - start_time - load_seconds
+
+    report = batch.wait()
+    report['blend_file'] = bpy.data.filepath
+    report['output_dir'] = output_dir
+    report['timings'] = {
+        'load': round(load_seconds, 3),
+        'prepare': round(prepare_seconds, 3),
+        'slice': report['seconds'],
+        'total': round(time.time() - start_time, 3),
+    }
+    return report
+
+def main(argv, package):
+    args = parse_args(argv)
+    prefs = bpy.context.preferences.addons[package].preferences
+
+    start_time = time.time()
+    # Reuses the persisted profile index, only bundles changed since the last session get parsed
+    prefs.update_config_bundle_manifest()
+    profile_seconds = time.time() - start_time
+
+    output_dir = os.path.abspath(os.path.expanduser(args.output))
+    os.makedirs(output_dir, exist_ok=True)
+    max_workers = args.jobs or prefs.batch_concurrency
+
+    used_names = set()
+    files = [
+        slice_blend_file(os.path.abspath(blend_path), args.collections, output_dir, package, max_workers, used_names)
+        for blend_path in args.blend_files
+    ] or [slice_blend_file(None, args.collections, output_dir, package, max_workers, used_names)]
+
+    results = {
+        'files': files,
+        'total': sum(report['total'] for report in files),
+        'succeeded': sum(report['succeeded'] for report in files),
+        'failed': sum(report['failed'] for report in files),
+        'skipped': sum(report['skipped'] for report in files),
+        'timings': {
+            'profiles': round(profile_seconds, 3),
+            'total': round(time.time() - start_time, 3),
+        },
+    }
+
+    if args.report:
+        with open(args.report, 'w') as file:
+            json.dump(results, file, indent=2)
+    else:
+        sys.stdout.write(json.dumps(results, indent=2) + "\n")
+
+    if results['succeeded'] + results['skipped'] < results['total']:
+        return EXIT_FAILED
+    return EXIT_SKIPPED if results['skipped'] else 0
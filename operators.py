@@ -1,17 +1,25 @@
 import bpy # type: ignore
+from bpy_extras.io_utils import ExportHelper # type: ignore
 import numpy as np
 
-import os, subprocess, time, tempfile, multiprocessing, json
+import os, subprocess, time, tempfile, shutil, multiprocessing
 from collections import namedtuple
 
 from .functions import prusaslicer_funcs as psf 
 
-from .functions.basic_functions import show_progress, threaded_copy, dict_from_json, redraw
+from .functions.basic_functions import show_progress, threaded_copy, redraw, dump_dict_to_json, profile_to_file
+from .functions.batch_slicing import BatchSlicer
+from .functions.timing import SliceTimer, timing_history
+from .functions.workspace import SliceWorkspace
 from .functions import blender_funcs as bf
 from .functions import gcode_funcs as gf
 from . import TYPES_NAME
 
-temp_files = []
+active_jobs = {}  # Collection name -> running SlicerJob
+active_batch = None
+BATCH_REPORT_NAME = "batch_report.json"
+SLICING_POLL_INTERVAL = 0.2
+PROCESS_POLL_INTERVAL = 2.0
 
 class UnmountUsbOperator(bpy.types.Operator):
     bl_idname = f"export.unmount_usb"
@@ -53,9 +61,18 @@ class RunPrusaSlicerOperator(bpy.types.Operator):
         show_progress(pg, 0, "Preparing Configuration...")
     
     def execute(self, context):
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        if not prefs.profile_slicing:
+            return self.run(context)
+
+        cx = bf.coll_from_selection()
+        return profile_to_file(self.run, profile_dump_path(prefs, cx.name), context)
+
+    def run(self, context):
         ws = context.workspace
         cx = bf.coll_from_selection()
         pg = getattr(cx, TYPES_NAME)
+        timer = SliceTimer()
 
         prefs = bpy.context.preferences.addons[__package__].preferences
         global prusaslicer_path
@@ -69,11 +86,8 @@ class RunPrusaSlicerOperator(bpy.types.Operator):
 
         if pg.printer_config_file and pg.filament_config_file and pg.print_config_file:
             try:
-                loader.load_config(pg.printer_config_file, prefs.profile_cache.config_headers, append=False)
-                loader.load_config(pg.filament_config_file, prefs.profile_cache.config_headers, append=True)
-                loader.load_config(pg.print_config_file, prefs.profile_cache.config_headers, append=True)
-                loader.load_list_to_overrides(pg.list)
-                loader.add_pauses_and_changes(pg.pause_list)
+                with timer.span('config'):
+                    loader = load_collection_config(pg, prefs.profile_cache)
             except:
                 show_progress(pg, 0, f'Error: failed to load configuration')
 
@@ -90,121 +104,214 @@ class RunPrusaSlicerOperator(bpy.types.Operator):
             getattr(cx, TYPES_NAME).running = 0
             return{'FINISHED'}
 
-        paths = determine_paths(loader.config_with_overrides, obj_names, self.mountpoint)
-
-        global temp_files
-        temp_files = []
+        with timer.span('depsgraph'):
+            depsgraph = bpy.context.evaluated_depsgraph_get()
+            selected_objects = [obj.evaluated_get(depsgraph) for obj in bpy.context.selected_objects if obj.type == 'MESH']
 
-        depsgraph = bpy.context.evaluated_depsgraph_get()
+        geometry = prepare_geometry(selected_objects, loader.config_with_overrides, prefs, timer)
 
-        selected_objects = [obj.evaluated_get(depsgraph) for obj in bpy.context.selected_objects if obj.type == 'MESH']
-        tris_by_object = [bf.objects_to_tris([obj], 1000) for obj in selected_objects]
+        workspace = new_workspace(prefs, geometry)
+        paths = determine_paths(loader.config_with_overrides, obj_names, self.mountpoint, prefs.mesh_export_format, workspace.path)
 
-        global_tris = np.concatenate(tris_by_object)
-        vertices = global_tris[:, :3, :]
-        min_coords, max_coords = vertices.min(axis=(0, 1)), vertices.max(axis=(0, 1))
-        bed_size = gf.get_bed_size(loader.config_with_overrides['bed_shape']) if 'bed_shape' in loader.config_with_overrides else (0, 0)
-        transform = (min_coords*(-0.5, -0.5, 1) + max_coords*(-0.5, -0.5, 0)) + np.array([bed_size[0]/2, bed_size[1]/2, 0])
+        gcode_cache, cache_key = None, None
+        if loader.config_dict and self.mode in ("slice", "slice_and_preview"):
+            gcode_cache, cache_key, cached_entry = lookup_cached_gcode(loader, geometry, prefs, timer)
 
-        all_tris = []
+            if cached_entry:
+                workspace.cleanup()
+                threaded_copy(cached_entry['path'], paths.gcode_path)
+                if self.mode == "slice_and_preview":
+                    process = show_preview(cached_entry['path'])
+                append_done = f" to {self.mountpoint.split('/')[-1]}" if self.mountpoint else ""
+                show_progress(pg, 100, f'Done (copied from cached gcode){append_done}')
 
-        for i, tris in enumerate(tris_by_object):
-            tris_transformed = bf.transform_tris(tris, transform)
-            all_tris.append(tris_transformed)
+                pg.print_time = cached_entry['stats'].get('print_time', '')
+                pg.print_weight = cached_entry['stats'].get('print_weight', '')
+                timing_history.record(cx.name, timer, mode=self.mode, result='cached')
 
-        # Combine all transformed triangles into a single numpy array
-        all_tris_combined = np.concatenate(all_tris, axis=0)
+                getattr(cx, TYPES_NAME).running = 0
+                return {'FINISHED'}
 
-        bf.save_stl(all_tris_combined, paths.stl_path)
-        temp_files.append(paths.stl_path)
+        try:
+            with timer.span('export_model'):
+                save_model(geometry, paths.stl_path, prefs.mesh_export_format)
+
+            if loader.config_dict:
+                with timer.span('write_ini'):
+                    loader.write_ini(paths.ini_path)
+        except OSError as e:
+            workspace.cleanup()
+            show_progress(pg, 0, f'Error: failed to write the slicing files ({e})')
+            pg.running = 0
+            return {'FINISHED'}
 
-        if not loader.config_dict:
+        if not loader.config_dict or self.mode == "open":
             show_progress(pg, 100, 'Opening PrusaSlicer')
             command = [paths.stl_path]
+            if loader.config_dict:
+                command += ["--load", paths.ini_path] + ["--dont-arrange"]
 
-            results_queue = multiprocessing.Queue()
-            process = multiprocessing.Process(target=run_slice, args=(command, None, results_queue))
+            process = multiprocessing.Process(target=psf.exec_prusaslicer, args=(command, prusaslicer_path,))
             process.start()
-            bpy.app.timers.register(lambda: slicing_queue(pg, paths, results_queue), first_interval=0.5)
+            # PrusaSlicer keeps reading the workspace files until it is closed
+            bpy.app.timers.register(lambda: cleanup_after_exit(process, workspace), first_interval=PROCESS_POLL_INTERVAL)
 
-            getattr(cx, TYPES_NAME).running = 0
+            pg.running = 0
             return {'FINISHED'}
 
-        temp_files.append(loader.write_ini(paths.ini_path))
-
-        if self.mode == "open":
-            show_progress(pg, 100, 'Opening PrusaSlicer')
-            command = [paths.stl_path] + ["--load", paths.ini_path] + ["--dont-arrange"]
+        if self.mode in ("slice", "slice_and_preview"):
+            show_progress(pg, 30, 'Slicing with PrusaSlicer...')
+            command = slice_command(paths)
 
-            process = multiprocessing.Process(target=psf.exec_prusaslicer, args=(command, prusaslicer_path,))
-            process.start()
+            # The operator is freed once execute returns, the timer must only capture plain values
+            mode, job_key = self.mode, cx.name
+            job = psf.SlicerJob(command, prusaslicer_path)
+            active_jobs[job_key] = job
+            job.start(lambda job: run_slice(job, paths, gcode_cache, cache_key, timer=timer))
+            bpy.app.timers.register(lambda: slicing_queue(pg, paths, job, job_key, workspace, timer, mode), first_interval=SLICING_POLL_INTERVAL)
 
-            pg.running = 0
             return {'FINISHED'}
 
-        if os.path.exists(paths.gcode_temp_path) and os.path.exists(paths.json_temp_path):
-            cached_data = dict_from_json(paths.json_temp_path)
-            stl_chk = bf.calculate_md5([paths.stl_path])
-            ini_chk = bf.calculate_md5([paths.ini_path])
+class RunBatchSliceOperator(bpy.types.Operator):
+    bl_idname = f"export.slice_batch"
+    bl_label = "Slice All Collections"
+    bl_description = "Slice every collection of the scene that has its printer, filament and print configurations set, as separate jobs"
 
-            if stl_chk == cached_data.get('stl_chk') and ini_chk == cached_data.get('ini_chk'):
+    def execute(self, context):
+        prefs = bpy.context.preferences.addons[__package__].preferences
+        global prusaslicer_path
+        prusaslicer_path = prefs.prusaslicer_path
 
-                threaded_copy(paths.gcode_temp_path, paths.gcode_path)
-                if self.mode == "slice_and_preview":
-                    process = show_preview(paths.gcode_temp_path)
-                append_done = f" to {self.mountpoint.split('/')[-1]}" if self.mountpoint else ""
-                show_progress(pg, 100, f'Done (copied from cached gcode){append_done}')
-                
-                print_time, print_weight = get_stats(paths.gcode_temp_path)
-                pg.print_time = print_time
-                pg.print_weight = print_weight
+        global active_batch
+        if active_batch and not active_batch.finished:
+            self.report({'WARNING'}, "A batch is already running")
+            return {'CANCELLED'}
 
-                getattr(cx, TYPES_NAME).running = 0
-                return {'FINISHED'}
+        collections, skipped = sliceable_collections(context.scene)
+        if not collections:
+            self.report({'WARNING'}, "No collection with mesh objects and a complete configuration")
+            return {'CANCELLED'}
 
-        if self.mode in ("slice", "slice_and_preview"):
-            show_progress(pg, 30, 'Slicing with PrusaSlicer...')
-            command = [
-                "--load", paths.ini_path, 
-                "-g",
-                "--dont-arrange",
-                "--output", os.path.join(paths.gcode_temp_path)
-            ]
-            command += [paths.stl_path]
-
-            results_queue = multiprocessing.Queue()
-            process = multiprocessing.Process(target=run_slice, args=(command, paths, results_queue))
-            process.start()
-            bpy.app.timers.register(lambda: slicing_queue(pg, paths, results_queue), first_interval=0.5)
+        depsgraph = context.evaluated_depsgraph_get()
+        batch = BatchSlicer(prusaslicer_path, prefs.batch_concurrency)
+        for name, reason in skipped.items():
+            batch.add_result(name, 'skipped', reason)
+        if skipped:
+            self.report({'WARNING'}, f"Skipped {len(skipped)} collection(s): {', '.join(f'{name} ({reason})' for name, reason in skipped.items())}")
+        pgs = {}
+        for cx in collections:
+            pg = getattr(cx, TYPES_NAME)
+            pg.running = 1
+            show_progress(pg, 0, "Queued")
+            pgs[cx.name] = pg
+            submit_batch_job(batch, cx, depsgraph, prefs)
+
+        active_batch = batch
+        bpy.app.timers.register(lambda: batch_queue(batch, pgs), first_interval=SLICING_POLL_INTERVAL)
+        return {'FINISHED'}
+
+class CancelSliceOperator(bpy.types.Operator):
+    bl_idname = f"export.cancel_slice"
+    bl_label = "Cancel Slicing"
+
+    collection_name: bpy.props.StringProperty(name="", default="") # type: ignore
 
+    def execute(self, context):
+        # The collection comes from the panel that showed the button, the selection may have changed since
+        name = self.collection_name
+        job = active_jobs.get(name)
+        if job is None and active_batch and not active_batch.finished and name in active_batch.results:
+            active_batch.cancel()
             return {'FINISHED'}
-        
-def slicing_queue(pg, paths, results_queue):
-    if results_queue.empty():
-        return 0.5 
+        if job is None:
+            self.report({'INFO'}, f"No slicing job running for {name}")
+            return {'CANCELLED'}
 
-    result = results_queue.get()
+        job.cancel()
+        cx = context.scene.collection if context.scene.collection.name == name else bpy.data.collections.get(name)
+        if cx is not None:
+            show_progress(getattr(cx, TYPES_NAME), 0, "Cancelling...")
+        return {'FINISHED'}
+
+class ExportSliceTimingsOperator(bpy.types.Operator, ExportHelper):
+    bl_idname = f"export.slice_timings"
+    bl_label = "Export Slicing Timings"
+    bl_description = "Save the recent slicing timings of every collection, as JSON or as CSV depending on the file extension"
+
+    filename_ext = ".json"
+    check_extension = None
+    filter_glob: bpy.props.StringProperty(default="*.json;*.csv", options={'HIDDEN'}) # type: ignore
+
+    def execute(self, context):
+        try:
+            if self.filepath.lower().endswith(".csv"):
+                timing_history.write_csv(self.filepath)
+            else:
+                timing_history.write_json(self.filepath)
+        except OSError as e:
+            self.report({'ERROR'}, f"Failed to export timings: {str(e)}")
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+class ClearSliceTimingsOperator(bpy.types.Operator):
+    bl_idname = f"export.clear_slice_timings"
+    bl_label = "Clear Slicing Timings"
+
+    def execute(self, context):
+        timing_history.clear()
+        redraw()
+        return {'FINISHED'}
+
+def slicing_queue(pg, paths, job, job_key, workspace, timer=None, mode=""):
+    if not job.done.is_set():
+        # Slicing covers 30-95% of the progress bar, the rest is exporting and reading the results
+        progress_pct, progress_text = job.progress
+        show_progress(pg, 30 + int(progress_pct * 0.65), f"Slicing: {progress_text}")
+        return SLICING_POLL_INTERVAL
 
-    if not result.get("error", False):
+    if active_jobs.get(job_key) is job:
+        del active_jobs[job_key]
+
+    result = job.result
+    if result is None:
+        pg.print_time = "Error"
+        pg.print_weight = "Error"
+        show_progress(pg, 0, f"Failed ({job.error})" if job.error else "Error")
+    else:
         pg.print_time = result["print_time"]
         pg.print_weight = result["print_weight"]
         show_progress(pg, result["progress_pct"], result["progress_text"])
-    else:
-        pg.print_time = "Error"
-        pg.print_weight = "Error"
-        show_progress(pg, 0, "Error")
+
+    if timer:
+        timing_history.record(job_key, timer, mode=mode, result='failed' if job.error else 'done')
 
     pg.running = 0
     redraw()
 
-    show_preview(paths.gcode_temp_path)
-    cleanup()
+    workspace.cleanup()
+    # The gcode was copied out of the workspace by run_slice before the job was done
+    if not job.error:
+        show_preview(paths.gcode_path)
 
     return None
 
+def cleanup_after_exit(process, workspace):
+    if process.is_alive():
+        return PROCESS_POLL_INTERVAL
+    workspace.cleanup()
+    return None
+
+def new_workspace(prefs, geometry):
+    # Room for the exported model, text formats take a few times the size of the arrays
+    required_bytes = 4 * sum(array.nbytes for array in geometry if array is not None)
+    workspace = SliceWorkspace(prefs.temp_files_location == 'RAM', required_bytes)
+    if prefs.temp_files_location == 'RAM' and not workspace.in_ram:
+        print(f"No RAM-backed temp folder with enough space, using {workspace.path}")
+    return workspace
+
 
-def determine_paths(config, obj_names, mountpoint):
-    paths = namedtuple('Paths', ['ini_path', 'stl_path', 'stl_temp_path', 'gcode_path', 'gcode_temp_path', 'json_temp_path'], defaults=[""]*5)
+def determine_paths(config, obj_names, mountpoint, model_ext='stl', workspace=None, output_dir=None):
+    paths = namedtuple('Paths', ['ini_path', 'stl_path', 'stl_temp_path', 'gcode_path', 'gcode_temp_path'], defaults=[""]*4)
 
     base_filename = "-".join(bf.names_array_from_objects(obj_names))
 
@@ -214,61 +321,241 @@ def determine_paths(config, obj_names, mountpoint):
     extension = "bgcode" if config.get('binary_gcode', '0') == '1' else "gcode"
     full_filename = f"{base_filename}-{filament}-{printer}"
     gcode_filename = f"{full_filename}.{extension}"
-    json_filename = f"{full_filename}.json"
 
-    temp_dir = tempfile.gettempdir()
+    # Every slice gets its own workspace so concurrent slices never share the model or config.ini
+    temp_dir = workspace or tempfile.gettempdir()
 
     blendfile_directory = os.path.dirname(bpy.data.filepath)
-    paths.stl_path = os.path.join(temp_dir, base_filename + ".stl")
+    paths.stl_path = os.path.join(temp_dir, f"{base_filename}.{model_ext}")
 
-    if mountpoint:
+    if output_dir:
+        gcode_dir = output_dir
+    elif mountpoint:
         gcode_dir = mountpoint
     elif blendfile_directory:
         gcode_dir = blendfile_directory
     else:
-        gcode_dir = temp_dir
+        gcode_dir = tempfile.gettempdir()
 
     paths.gcode_path = os.path.join(gcode_dir, gcode_filename)
     paths.gcode_temp_path = os.path.join(temp_dir, gcode_filename)
-    paths.json_temp_path = os.path.join(temp_dir, json_filename)
     paths.ini_path = os.path.join(temp_dir, 'config.ini')
     return paths
 
-def run_slice(command, paths, results_queue = None):
+def load_collection_config(pg, profile_cache):
+    loader = bf.ConfigLoader()
+    loader.load_config(pg.printer_config_file, profile_cache, append=False)
+    loader.load_config(pg.filament_config_file, profile_cache, append=True)
+    loader.load_config(pg.print_config_file, profile_cache, append=True)
+    loader.load_list_to_overrides(pg.list)
+    loader.add_pauses_and_changes(pg.pause_list)
+    return loader
+
+def prepare_geometry(objects, config, prefs, timer=None):
+    """Builds the export arrays of evaluated mesh objects, centered on the bed. Returns (tris, vertices, faces)."""
+    timer = timer or SliceTimer()
+    global_tris, faces = None, None
+    with timer.span('mesh_to_tris'):
+        if prefs.mesh_export_format == 'stl':
+            global_tris = bf.cached_objects_to_tris(objects, 1000, prefs.mesh_cache)
+            vertices = global_tris.reshape(-1, 3)
+        else:
+            vertices, faces = bf.cached_objects_to_indexed(objects, 1000, prefs.mesh_cache)
+
+    with timer.span('transform'):
+        min_coords, max_coords = vertices.min(axis=0), vertices.max(axis=0)
+        bed_size = gf.get_bed_size(config['bed_shape']) if 'bed_shape' in config else (0, 0)
+        transform = (min_coords*(-0.5, -0.5, 1) + max_coords*(-0.5, -0.5, 0)) + np.array([bed_size[0]/2, bed_size[1]/2, 0])
+
+        bf.transform_tris(vertices, transform)
+    return global_tris, vertices, faces
 
+def save_model(geometry, path, model_ext):
+    global_tris, vertices, faces = geometry
+    if model_ext == '3mf':
+        bf.save_3mf(vertices, faces, path)
+    elif model_ext == 'obj':
+        bf.save_obj(vertices, faces, path)
+    else:
+        bf.save_stl(global_tris, path, chunk_size=bf.STL_CHUNK_SIZE)
+
+def lookup_cached_gcode(loader, geometry, prefs, timer=None):
+    # The cache key only needs the in-memory geometry and config, so a hit never touches the disk
+    timer = timer or SliceTimer()
+    global_tris, vertices, faces = geometry
+    geometry_arrays = [global_tris] if global_tris is not None else [vertices, faces]
+    gcode_cache = prefs.get_gcode_cache()
+    with timer.span('hashing'):
+        cache_key = gcode_cache.make_key(
+            bf.calculate_array_digest(geometry_arrays),
+            loader.config_digest(),
+            psf.get_prusaslicer_version(prefs.prusaslicer_path),
+        )
+    with timer.span('cache_lookup'):
+        cached_entry = gcode_cache.get(cache_key)
+    return gcode_cache, cache_key, cached_entry
+
+def slice_command(paths):
+    return [
+        "--load", paths.ini_path,
+        "-g",
+        "--dont-arrange",
+        "--output", paths.gcode_temp_path,
+        paths.stl_path,
+    ]
+
+def collection_slice_issue(cx):
+    """Returns why a collection can't be sliced on its own, None when it can."""
+    pg = getattr(cx, TYPES_NAME)
+    missing = [category for category in ('printer', 'filament', 'print') if not getattr(pg, f"{category}_config_file")]
+    if missing:
+        return f"No {', '.join(missing)} profile selected"
+    if not any(obj.type == 'MESH' for obj in cx.objects):
+        # Meshes of child collections belong to those collections, as in the panel, and are sliced with their settings
+        nested_meshes = sum(1 for obj in cx.all_objects if obj.type == 'MESH')
+        if nested_meshes:
+            return f"No mesh objects of its own, {nested_meshes} in child collections"
+        return "No mesh objects"
+    return None
+
+def sliceable_collections(scene):
+    """Returns the collections of the scene that can be sliced and {name: reason} for the ones that were skipped.
+
+    Collections without any setting and without meshes of their own are left out of both.
+    """
+    sliceable, skipped = [], {}
+    for cx in [scene.collection] + list(scene.collection.children_recursive):
+        issue = collection_slice_issue(cx)
+        if issue is None:
+            sliceable.append(cx)
+            continue
+        pg = getattr(cx, TYPES_NAME)
+        if any(obj.type == 'MESH' for obj in cx.objects) or pg.printer_config_file or pg.filament_config_file or pg.print_config_file:
+            skipped[cx.name] = issue
+    return sliceable, skipped
+
+def submit_batch_job(batch, cx, depsgraph, prefs, output_dir=None):
+    """Exports one collection into its own workspace and queues it, cache hits and failures are recorded directly."""
     start_time = time.time()
-    res = psf.exec_prusaslicer(command, prusaslicer_path)
-    
+    # on_finished runs on the job's reader thread, where the collection itself must not be touched
+    name = cx.name
+    timer = SliceTimer()
+    workspace = None
+    try:
+        with timer.span('config'):
+            loader = load_collection_config(getattr(cx, TYPES_NAME), prefs.profile_cache)
+        with timer.span('depsgraph'):
+            objects = [obj.evaluated_get(depsgraph) for obj in cx.objects if obj.type == 'MESH']
+        geometry = prepare_geometry(objects, loader.config_with_overrides, prefs, timer)
+        workspace = new_workspace(prefs, geometry)
+        paths = determine_paths(loader.config_with_overrides, [obj.name for obj in objects], "", prefs.mesh_export_format, workspace.path, output_dir)
+        # The gcode name only holds object and profile names, another collection of the batch can end up with the same
+        owner = batch.outputs.setdefault(paths.gcode_path, name)
+        if owner != name:
+            workspace.cleanup()
+            batch.add_result(name, 'failed', f"Collection '{owner}' writes the same gcode file {paths.gcode_path}", time.time() - start_time)
+            return
+
+        gcode_cache, cache_key, cached_entry = lookup_cached_gcode(loader, geometry, prefs, timer)
+        if cached_entry:
+            shutil.copy(cached_entry['path'], paths.gcode_path)
+            workspace.cleanup()
+            timing_history.record(name, timer, mode='batch', result='cached')
+            batch.add_result(name, 'cached', seconds=time.time() - start_time, gcode_path=paths.gcode_path, timings=timer.as_dict(), **cached_entry['stats'])
+            return
+
+        with timer.span('export_model'):
+            save_model(geometry, paths.stl_path, prefs.mesh_export_format)
+        with timer.span('write_ini'):
+            loader.write_ini(paths.ini_path)
+    except Exception as e:
+        if workspace:
+            workspace.cleanup()
+        batch.add_result(name, 'failed', f"Failed to prepare the job: {e}", time.time() - start_time)
+        return
+
+    def on_finished(job):
+        try:
+            result = run_slice(job, paths, gcode_cache, cache_key, timer=timer)
+            result['gcode_path'] = paths.gcode_path
+            result['timings'] = timer.as_dict()
+            timing_history.record(name, timer, mode='batch', result='failed' if job.error else 'done')
+            return result
+        finally:
+            workspace.cleanup()
+
+    batch.submit(name, slice_command(paths), on_finished)
+
+def batch_queue(batch, pgs):
+    finished = batch.poll()
+
+    for name, pg in pgs.items():
+        progress = batch.progress(name)
+        if progress is not None:
+            progress_pct, progress_text = progress
+            show_progress(pg, 30 + int(progress_pct * 0.65), f"Slicing: {progress_text}")
+            continue
+        if not pg.running:
+            continue
+        result = batch.results[name]
+        pg.print_time = result.get('print_time', '')
+        pg.print_weight = result.get('print_weight', '')
+        if result['status'] in ('done', 'cached'):
+            show_progress(pg, 100, f"Done (in {result['seconds']:.2f}s)")
+        else:
+            show_progress(pg, 0, f"Failed ({result['error']})")
+        pg.running = 0
+
+    if not finished:
+        return SLICING_POLL_INTERVAL
+
+    report = batch.report()
+    report_path = write_batch_report(report, os.path.dirname(bpy.data.filepath) or tempfile.gettempdir())
+    print(f"Batch sliced {report['succeeded']}/{report['total'] - report['skipped']} collections in {report['seconds']:.2f}s, {report['skipped']} skipped, report at {report_path}")
+    redraw()
+    return None
+
+def profile_dump_path(prefs, collection_name):
+    folder = bpy.path.abspath(prefs.profile_folder) or os.path.join(tempfile.gettempdir(), "unexpectedslicer_profiles")
+    safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in collection_name)
+    return os.path.join(folder, f"slice-{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+
+def write_batch_report(report, directory):
+    report_path = os.path.join(directory, BATCH_REPORT_NAME)
+    try:
+        dump_dict_to_json(report, report_path)
+    except OSError as e:
+        print(f"Failed to write the batch report: {e}")
+        return None
+    return report_path
+
+def run_slice(job, paths, gcode_cache = None, cache_key = None, timer = None):
+    """Runs on the job's reader thread once PrusaSlicer exits, so it must not touch bpy data."""
+    timer = timer or SliceTimer()
+    if job.start_time:
+        timer.add('prusaslicer', time.time() - job.start_time)
+
     print_time, print_weight = '', ''
-    if res:
-        end_time = time.time()
-        progress_pct, progress_text = (0, f'Failed ({res})')
+    if job.error:
+        progress_pct, progress_text = (0, f'Failed ({job.error})')
     else:
-        
-        if paths.gcode_temp_path:
-            checksums = {
-                "stl_chk": bf.calculate_md5([paths.stl_path]),
-                "ini_chk": bf.calculate_md5([paths.ini_path])
-            }
-            with open(paths.json_temp_path, 'w') as json_file:
-                json.dump(checksums, json_file, indent=4)
-            
+        with timer.span('stats'):
             print_time, print_weight = get_stats(paths.gcode_temp_path)
-            threaded_copy(paths.gcode_temp_path, paths.gcode_path)
-            
-        end_time = time.time()
-        progress_pct, progress_text = (100, f'Done (in {(end_time - start_time):.2f}s)')
-
-    if results_queue:
-        results_queue.put({
-                "error": False,
-                "print_time": print_time,
-                "print_weight": print_weight,
-                "progress_pct": progress_pct,
-                "progress_text": progress_text
-            })
-            
-    return {'FINISHED'}
+        if gcode_cache and cache_key:
+            with timer.span('cache_store'):
+                gcode_cache.put(cache_key, paths.gcode_temp_path, {'print_time': print_time, 'print_weight': print_weight})
+        with timer.span('copy_gcode'):
+            # Copied before the job is marked done, the workspace holding the gcode is removed right after
+            shutil.copy(paths.gcode_temp_path, paths.gcode_path)
+
+        progress_pct, progress_text = (100, f'Done (in {(time.time() - job.start_time):.2f}s)')
+
+    return {
+        "print_time": print_time,
+        "print_weight": print_weight,
+        "progress_pct": progress_pct,
+        "progress_text": progress_text
+    }
 
 def show_preview(gcode_path):
     if gcode_path and os.path.exists(gcode_path):
@@ -278,13 +565,14 @@ def show_preview(gcode_path):
         print("Gcode file not found: skipping preview.")
 
 def get_stats(gcode_path):
+    print_time, print_weight = '', ''
     if os.path.exists(gcode_path):
-        print_time = gf.parse_gcode(gcode_path, 'estimated printing time \(normal mode\)')
-        print_weight = gf.parse_gcode(gcode_path, 'filament used \[g\]')
-    return print_time if print_time else '', print_weight if print_weight else ''
+        try:
+            stats = gf.get_gcode_stats(gcode_path, ['estimated printing time (normal mode)', 'filament used [g]'])
+        except (ValueError, OSError) as e:
+            print(f"Failed to read gcode statistics: {e}")
+            stats = {}
+        print_time = stats.get('estimated printing time (normal mode)', '')
+        print_weight = stats.get('filament used [g]', '')
+    return print_time, print_weight
     
-def cleanup():
-    global temp_files
-    for file in temp_files:
-        os.remove(file)
-    temp_files = []
\ No newline at end of file
@@ -1,11 +1,16 @@
 import bpy # type: ignore
 from .functions.basic_functions import BasePanel, BaseList, SearchList, ParamAddOperator, ParamRemoveOperator, is_usb_device
 from .functions import blender_funcs as bf
+from .functions.timing import timing_history
 from . import TYPES_NAME
 
 class PRUSASLICER_UL_SearchParamValue(SearchList):
     def draw_properties(self, row, item):
         row.label(text=item.param_id + " - " + item.param_description)
+        if item.param_current_value:
+            sub_row = row.row()
+            sub_row.label(text=item.param_current_value)
+            sub_row.enabled = False
 
 class SelectedCollRemoveOperator(ParamRemoveOperator):
     bl_idname = f"{TYPES_NAME}.selected_coll_remove_param"
@@ -82,6 +87,9 @@ class PrusaSlicerPanel(BasePanel):
             
         row.operator(f"export.slice", text="Open with PrusaSlicer").mode="open"
 
+        row = layout.row()
+        row.operator(f"export.slice_batch", text="Slice All Collections", icon="OUTLINER_COLLECTION")
+
         if pg.print_time:
             row = layout.row()
             row.label(text=f"Printing time: {pg.print_time}")
@@ -90,8 +98,11 @@ class PrusaSlicerPanel(BasePanel):
             row.label(text=f"Print weight: {pg.print_weight}g")
 
         row = layout.row()
-        row.prop(pg, "progress", text=pg.progress_text, slider=True)
-        row.enabled = False
+        progress = row.row()
+        progress.prop(pg, "progress", text=pg.progress_text, slider=True)
+        progress.enabled = False
+        if pg.running:
+            row.operator(f"export.cancel_slice", text="", icon='CANCEL').collection_name = cx.name
 
         ### USB Devices
         import psutil
@@ -160,4 +171,41 @@ class SlicerPanel_1_Pauses(BasePanel):
                 )
         
         row = layout.row()
-        row.operator(f"{TYPES_NAME}.selected_coll_add_param").target=f"{self.list_id}"
\ No newline at end of file
+        row.operator(f"{TYPES_NAME}.selected_coll_add_param").target=f"{self.list_id}"
+
+class SlicerPanel_2_Timings(BasePanel):
+    bl_label = "Slicing Timings"
+    bl_idname = f"SCENE_PT_{TYPES_NAME}_Timings"
+    bl_parent_id = f"SCENE_PT_{TYPES_NAME}"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    @classmethod
+    def poll(cls, context):
+        return context.preferences.addons[__package__].preferences.show_slice_timings
+
+    def draw(self, context):
+        cx = bf.coll_from_selection()
+        records = timing_history.get(cx.name)
+
+        layout = self.layout
+
+        if not records:
+            row = layout.row()
+            row.label(text="No slices recorded for this collection yet")
+        else:
+            last = records[-1]
+            row = layout.row()
+            row.label(text=f"Last slice ({last.get('mode', '')}, {last.get('result', '')}): {last['total']:.2f}s")
+            col = layout.column(align=True)
+            for stage, seconds in last['spans'].items():
+                row = col.row()
+                row.label(text=stage)
+                row.label(text=f"{seconds:.3f}s ({100 * seconds / last['total'] if last['total'] else 0:.0f}%)")
+
+            if len(records) > 1:
+                row = layout.row()
+                row.label(text=f"Average of {len(records)} slices: {sum(record['total'] for record in records) / len(records):.2f}s")
+
+        row = layout.row()
+        row.operator(f"export.slice_timings", text="Export", icon='EXPORT')
+        row.operator(f"export.clear_slice_timings", text="Clear", icon='TRASH')
@@ -3,8 +3,11 @@ from bpy_extras.io_utils import ExportHelper, ImportHelper
 
 from .functions.basic_functions import ParamRemoveOperator, ParamAddOperator, reset_selection, dump_dict_to_json, dict_from_json, redraw
 from .functions.caching_local import LocalCache
+from .functions.caching_mesh import MeshCache
+from .functions.caching_gcode import GcodeCache
+from .functions.bundle_refresh import BundleRefresher
 
-from . import TYPES_NAME
+from . import TYPES_NAME, ADDON_FOLDER
     
 class ExportConfig(bpy.types.Operator, ExportHelper):
     bl_idname = f"{TYPES_NAME}.export_configs"
@@ -61,7 +64,7 @@ class PRUSASLICER_UL_ConfListBase(bpy.types.UIList):
 class ConfListItem(bpy.types.PropertyGroup):
     conf_id: bpy.props.StringProperty(name='') # type: ignore
     conf_label: bpy.props.StringProperty(name='') # type: ignore
-    conf_enabled: bpy.props.BoolProperty(name='') # type: ignore
+    conf_enabled: bpy.props.BoolProperty(name='', update=lambda self, context: get_prefs().invalidate_bundle_items()) # type: ignore
     conf_cat: bpy.props.StringProperty(name='') # type: ignore
     conf_cache_path: bpy.props.StringProperty(name='') # type: ignore
 
@@ -72,6 +75,7 @@ class SelectedCollRemoveOperator(ParamRemoveOperator):
         return bpy.context.preferences.addons[__package__].preferences
     def triggers(self):
         prefs = bpy.context.preferences.addons[__package__].preferences
+        prefs.invalidate_bundle_items()
         prefs.update_config_bundle_manifest()
     
 class SelectedCollAddOperator(ParamAddOperator):
@@ -99,61 +103,126 @@ def guess_prusaslicer_path():
 
     return ''
 
+def profile_index_path():
+    try:
+        folder = bpy.utils.extension_path_user(__package__, path="cache", create=True)
+    except (AttributeError, ValueError):
+        folder = os.path.join(ADDON_FOLDER, "cache")
+    return os.path.join(folder, "profile_index.pickle")
+
+def get_prefs():
+    return bpy.context.preferences.addons[__package__].preferences
+
+def apply_background_bundle_scan(current_files, parsed_files):
+    get_prefs().apply_bundle_scan(current_files, parsed_files)
+    redraw()
+
+def watch_bundles_folder():
+    # Polling watcher, each tick only stats the folder on a worker thread and parses what changed
+    prefs = get_prefs()
+    if prefs.bundle_watch_interval <= 0:
+        return None
+    prefs.update_config_bundle_manifest_async()
+    return prefs.bundle_watch_interval
+
 class PrusaSlicerPreferences(bpy.types.AddonPreferences):
     bl_idname = __package__
     profile_cache = LocalCache()
+    mesh_cache = MeshCache()
+    bundle_refresher = BundleRefresher()
+    bundle_items_cache = {}
 
     def get_filtered_bundle_items(self, cat):
-        items = [("","","")] + sorted(
-            [
-                (item.conf_id, item.conf_label, "")
-                for item in self.prusaslicer_bundle_list
-                if (item.conf_cat == cat or not cat) and item.conf_enabled
-            ],
-            key=lambda x: x[1]
-        )
-        return items
+        return self._bundle_items_table(cat)[0]
 
     def get_filtered_bundle_item_index(self, cat, id):
-        items = self.get_filtered_bundle_items(cat)
-        for idx, (conf_id, _, _) in enumerate(items):
-            if conf_id == id:
-                return idx
-        return 0
+        return self._bundle_items_table(cat)[1].get(id, 0)
 
     def get_filtered_bundle_item_by_index(self, cat, idx):
         items = self.get_filtered_bundle_items(cat)
         return items[idx] if idx < len(items) else ("", "", "")
 
-    def update_config_bundle_manifest(self, context=None):
+    def _bundle_items_table(self, cat):
+        # Enum items and id -> index per category, rebuilt only after invalidate_bundle_items.
+        # Keeping the item lists referenced here is also what Blender needs for dynamic enum items.
+        if cat not in self.bundle_items_cache:
+            items = [("","","")] + sorted(
+                [
+                    (item.conf_id, item.conf_label, "")
+                    for item in self.prusaslicer_bundle_list
+                    if (item.conf_cat == cat or not cat) and item.conf_enabled
+                ],
+                key=lambda x: x[1]
+            )
+            self.bundle_items_cache[cat] = (items, {conf_id: idx for idx, (conf_id, _, _) in enumerate(items)})
+        return self.bundle_items_cache[cat]
+
+    def invalidate_bundle_items(self):
+        self.bundle_items_cache.clear()
+
+    def get_gcode_cache(self):
+        return GcodeCache(bpy.path.abspath(self.gcode_cache_folder) or None, self.gcode_cache_size * 1024 * 1024)
+
+    def update_lazy_profile_loading(self, context=None):
+        # Switching modes needs a full rescan, the persisted index is only reused for the same mode
+        self.profile_cache.lazy = self.lazy_profile_loading
+        self.profile_cache.clear()
+        self.update_config_bundle_manifest()
+
+    def prepare_profile_cache(self):
+        self.profile_cache.lazy = self.lazy_profile_loading
+        self.profile_cache.workers = self.bundle_scan_workers
         self.profile_cache.directory = self.prusaslicer_bundles_folder
-        self.profile_cache.load_ini_files()
-        self.profile_cache.process_all_files()
-    
-        if self.profile_cache.has_changes():
-            existing_confs = [c.conf_id for c in self.prusaslicer_bundle_list]
-            cache_conf_ids = set(self.profile_cache.config_headers.keys())
-
-            for idx in reversed(range(len(self.prusaslicer_bundle_list))):
-                item = self.prusaslicer_bundle_list[idx]
-                if item.conf_id not in cache_conf_ids:
-                    self.prusaslicer_bundle_list.remove(idx)
-
-            for key, config in self.profile_cache.config_headers.items():
-                if '*' in key:
-                    continue
-                if config['category'] not in ['printer', 'filament', 'print']:
-                    continue
-                if key in existing_confs:
-                    continue
-                new_item = self.prusaslicer_bundle_list.add()
-                new_item.conf_id = key
-                new_item.name = key
-                new_item.conf_label = config['id']
-                new_item.conf_cat = config['category']
-                new_item.conf_enabled = not config['has_header']
-
-        return
+        # On the first call of a session, start from the persisted index so only changed files get parsed
+        return not self.profile_cache.local_files and self.profile_cache.load_index(profile_index_path())
+
+    def update_config_bundle_manifest(self, context=None):
+        first_load = self.prepare_profile_cache()
+        self.apply_bundle_scan(self.profile_cache.scan_files(), None, first_load)
+
+    def update_config_bundle_manifest_async(self, context=None):
+        if self.prepare_profile_cache():
+            self.sync_bundle_list()
+        self.bundle_refresher.request(self.profile_cache, apply_background_bundle_scan)
+
+    def apply_bundle_scan(self, current_files, parsed_files=None, force_sync=False):
+        if current_files is not None:
+            self.profile_cache.load_ini_files(current_files)
+            self.profile_cache.process_all_files(parsed_files)
+
+            if self.profile_cache.has_changes():
+                self.profile_cache.save_index(profile_index_path())
+
+        if force_sync or self.profile_cache.has_changes():
+            self.sync_bundle_list()
+
+    def sync_bundle_list(self):
+        existing_confs = {c.conf_id for c in self.prusaslicer_bundle_list}
+        cache_conf_ids = self.profile_cache.config_headers
+
+        for idx in reversed(range(len(self.prusaslicer_bundle_list))):
+            item = self.prusaslicer_bundle_list[idx]
+            if item.conf_id not in cache_conf_ids:
+                self.prusaslicer_bundle_list.remove(idx)
+
+        for key in [key for cat in ['printer', 'filament', 'print'] for key in sorted(self.profile_cache.keys_in_category(cat))]:
+            if '*' in key:
+                continue
+            if key in existing_confs:
+                continue
+            config = self.profile_cache.config_headers[key]
+            new_item = self.prusaslicer_bundle_list.add()
+            new_item.conf_id = key
+            new_item.name = key
+            new_item.conf_label = config['id']
+            new_item.conf_cat = config['category']
+            new_item.conf_enabled = not config['has_header']
+
+        self.invalidate_bundle_items()
+
+    def update_bundle_watch_interval(self, context=None):
+        if self.bundle_watch_interval > 0 and not bpy.app.timers.is_registered(watch_bundles_folder):
+            bpy.app.timers.register(watch_bundles_folder, first_interval=self.bundle_watch_interval, persistent=True)
     
     default_bundles_added: bpy.props.BoolProperty() #type: ignore
 
@@ -164,12 +233,105 @@ class PrusaSlicerPreferences(bpy.types.AddonPreferences):
         default=guess_prusaslicer_path(),
     ) #type: ignore
 
+    mesh_export_format: bpy.props.EnumProperty(
+        name="Mesh export format",
+        description="File format used to hand the selected meshes over to PrusaSlicer",
+        items=[
+            ('stl', "STL", "Binary STL triangle soup"),
+            ('3mf', "3MF", "Zipped 3MF with shared, indexed vertices"),
+            ('obj', "OBJ", "Wavefront OBJ with shared, indexed vertices"),
+        ],
+        default='stl',
+    ) #type: ignore
+
+    mesh_cache_size: bpy.props.IntProperty(
+        name="Mesh cache size (MB)",
+        description="Memory budget for the per-object triangle cache reused between slices, 0 disables it",
+        default=512,
+        min=0,
+        update=lambda self, context: self.mesh_cache.set_budget(self.mesh_cache_size * 1024 * 1024),
+    ) #type: ignore
+
+    temp_files_location: bpy.props.EnumProperty(
+        name="Temporary files",
+        description="Where the model, config and gcode of a slice are written before PrusaSlicer reads them",
+        items=[
+            ('DISK', "Temp folder", "The system temp folder"),
+            ('RAM', "RAM", "A RAM-backed folder such as /dev/shm on Linux, the temp folder is used when there is none or it is short on space"),
+        ],
+        default='DISK',
+    ) #type: ignore
+
+    gcode_cache_folder: bpy.props.StringProperty(
+        name="Gcode cache path",
+        description="Folder storing previously sliced gcode, leave empty to use the system temp folder",
+        subtype='DIR_PATH',
+        default="",
+    ) #type: ignore
+
+    gcode_cache_size: bpy.props.IntProperty(
+        name="Gcode cache size (MB)",
+        description="Maximum disk space used by cached gcode, least recently used results are evicted first",
+        default=1024,
+        min=0,
+    ) #type: ignore
+
     prusaslicer_bundles_folder: bpy.props.StringProperty(
         name="PrusaSlicer .ini bundles path",
         description="Path to the folder containing the PrusaSlicer configurations (recursive)",
         subtype='FILE_PATH',
         default="//profiles",
-        update=update_config_bundle_manifest,
+        update=update_config_bundle_manifest_async,
+    ) #type: ignore
+
+    bundle_watch_interval: bpy.props.FloatProperty(
+        name="Watch bundles folder (s)",
+        description="Interval at which the bundles folder is checked for new or edited .ini files in the background, 0 disables watching",
+        default=0,
+        min=0,
+        update=update_bundle_watch_interval,
+    ) #type: ignore
+
+    lazy_profile_loading: bpy.props.BoolProperty(
+        name="Lazy profile loading",
+        description="Only index profile names when scanning bundles, and read a profile's settings the first time it is sliced with",
+        default=False,
+        update=update_lazy_profile_loading,
+    ) #type: ignore
+
+    bundle_scan_workers: bpy.props.IntProperty(
+        name="Bundle scan workers",
+        description="Processes used to parse changed .ini files, 1 parses on the main thread and 0 uses every CPU",
+        default=1,
+        min=0,
+        max=64,
+    ) #type: ignore
+
+    batch_concurrency: bpy.props.IntProperty(
+        name="Batch concurrency",
+        description="PrusaSlicer processes run at the same time when slicing all collections",
+        default=2,
+        min=1,
+        max=64,
+    ) #type: ignore
+
+    show_slice_timings: bpy.props.BoolProperty(
+        name="Show slicing timings",
+        description="Show the time spent in each stage of the recent slices in the scene panel",
+        default=False,
+    ) #type: ignore
+
+    profile_slicing: bpy.props.BoolProperty(
+        name="Profile slicing",
+        description="Capture a cProfile of every run of the Slice operator and save it as a .prof file",
+        default=False,
+    ) #type: ignore
+
+    profile_folder: bpy.props.StringProperty(
+        name="Profiles path",
+        description="Folder receiving the .prof files, leave empty to use the system temp folder",
+        subtype='DIR_PATH',
+        default="",
     ) #type: ignore
 
     prusaslicer_bundle_list: bpy.props.CollectionProperty(type=ConfListItem) # type: ignore
@@ -180,7 +342,23 @@ class PrusaSlicerPreferences(bpy.types.AddonPreferences):
         row = layout.row()
         row.prop(self, "prusaslicer_path")
         row = layout.row()
+        row.prop(self, "mesh_export_format")
+        row.prop(self, "mesh_cache_size")
+        row.prop(self, "batch_concurrency")
+        row = layout.row()
+        row.prop(self, "temp_files_location")
+        row = layout.row()
+        row.prop(self, "gcode_cache_folder")
+        row.prop(self, "gcode_cache_size")
+        row = layout.row()
         row.prop(self, "prusaslicer_bundles_folder")
+        row.prop(self, "lazy_profile_loading")
+        row.prop(self, "bundle_scan_workers")
+        row.prop(self, "bundle_watch_interval")
+        row = layout.row()
+        row.prop(self, "show_slice_timings")
+        row.prop(self, "profile_slicing")
+        row.prop(self, "profile_folder")
 
         box = layout.box()
         row = box.row()
@@ -1,7 +1,10 @@
 import bpy
 import os
-from .functions.basic_functions import parse_csv_to_tuples, reset_selection
-from . import ADDON_FOLDER
+import functools
+from .functions.basic_functions import reset_selection, redraw
+from .functions import blender_funcs as bf
+from .functions.search_index import ParamSearchIndex
+from . import ADDON_FOLDER, TYPES_NAME
 
 prefs = bpy.context.preferences.addons[__package__].preferences
 
@@ -9,6 +12,7 @@ class ParamSearchListItem(bpy.types.PropertyGroup):
     param_id: bpy.props.StringProperty(name='') # type: ignore
     param_name: bpy.props.StringProperty(name='') # type: ignore
     param_description: bpy.props.StringProperty(name='') # type: ignore
+    param_current_value: bpy.props.StringProperty(name='') # type: ignore
 
 class ParamsListItem(bpy.types.PropertyGroup):
     param_id: bpy.props.StringProperty(name='') # type: ignore
@@ -47,11 +51,78 @@ def set_enum(self, value, cat):
         setattr(self, f"{cat}_config_file", "")
     return
 
-cached_bundle_items = {'printer' : None, 'filament' : None, 'print' : None}
+SEARCH_RESULTS_LIMIT = 50
+SEARCH_DEBOUNCE_INTERVAL = 0.15
+
+def get_search_index():
+    # CSV descriptions merged with every key present in the loaded profiles, resynced when the bundles change
+    if not hasattr(get_search_index, 'index'):
+        get_search_index.index = ParamSearchIndex.from_csv(os.path.join(ADDON_FOLDER, 'functions', 'prusaslicer_fields.csv'))
+        get_search_index.version = None
+    if get_search_index.version != prefs.profile_cache.version:
+        get_search_index.index.sync_keys(prefs.profile_cache.profile_keys())
+        get_search_index.version = prefs.profile_cache.version
+    return get_search_index.index
+
+def get_current_values(pg):
+    # Effective config of the selected profiles plus overrides, computed once per selection rather than per row
+    cache_key = (
+        prefs.profile_cache.version,
+        pg.printer_config_file, pg.filament_config_file, pg.print_config_file,
+        tuple((item.param_id, item.param_value) for item in pg.list),
+    )
+    if getattr(get_current_values, 'key', None) != cache_key:
+        loader = bf.ConfigLoader()
+        try:
+            loader.load_config(pg.printer_config_file, prefs.profile_cache, append=False)
+            loader.load_config(pg.filament_config_file, prefs.profile_cache, append=True)
+            loader.load_config(pg.print_config_file, prefs.profile_cache, append=True)
+        except (KeyError, ValueError, OSError):
+            loader.config_dict = {}
+        loader.load_list_to_overrides(pg.list)
+        get_current_values.key = cache_key
+        get_current_values.values = loader.config_with_overrides
+    return get_current_values.values
+
+pending_searches = {}
+def run_pending_search(owner_key):
+    pending_searches.pop(owner_key, None)
+    owner_type, owner_name = owner_key
+    if owner_type == 'SCENE':
+        scene = bpy.data.scenes.get(owner_name)
+        collection = scene.collection if scene else None
+    else:
+        collection = bpy.data.collections.get(owner_name)
+    if collection is None:
+        return None
+    pg = getattr(collection, TYPES_NAME)
+
+    pg.search_list.clear()
+    pg.search_list_index = -1
+    if not pg.search_term:
+        return None
+
+    current_values = get_current_values(pg)
+    for param_id, param_name, param_description in get_search_index().search(pg.search_term, SEARCH_RESULTS_LIMIT):
+        new_item = pg.search_list.add()
+        new_item.param_id = param_id
+        new_item.param_name = param_name
+        new_item.param_description = param_description
+        new_item.param_current_value = current_values.get(param_id, '')
+    redraw()
+    return None
+
+def schedule_search(self, context):
+    # Typing restarts the timer, so the list is only rebuilt once the user pauses
+    # The scene's master collection is embedded in the scene, so its id_data is the scene itself
+    owner_key = ('SCENE' if isinstance(self.id_data, bpy.types.Scene) else 'COLLECTION', self.id_data.name)
+    if owner_key in pending_searches and bpy.app.timers.is_registered(pending_searches[owner_key]):
+        bpy.app.timers.unregister(pending_searches[owner_key])
+    pending_searches[owner_key] = functools.partial(run_pending_search, owner_key)
+    bpy.app.timers.register(pending_searches[owner_key], first_interval=SEARCH_DEBOUNCE_INTERVAL)
+
 def get_items(self, cat):
-    global cached_bundle_items
-    cached_bundle_items = prefs.get_filtered_bundle_items(cat)
-    return cached_bundle_items
+    return prefs.get_filtered_bundle_items(cat)
 
 class PrusaSlicerPropertyGroup(bpy.types.PropertyGroup):
 
@@ -94,25 +165,7 @@ class PrusaSlicerPropertyGroup(bpy.types.PropertyGroup):
         set=lambda self, value: set_enum(self, value, 'print'),
     ) # type: ignore
     
-    def search_param_list(self, context):
-        if not self.search_term:
-            return
-        
-        self.search_list.clear()
-        self.search_list_index = -1
-
-        search_db_path = os.path.join(ADDON_FOLDER, 'functions', 'prusaslicer_fields.csv')
-        search_db = parse_csv_to_tuples(search_db_path)
-        filtered_tuples = [tup for tup in search_db if all(word in (tup[1] + ' ' + tup[2]).lower() for word in self.search_term.lower().split())]
-        sorted_tuples = sorted(filtered_tuples, key=lambda tup: tup[0])
-
-        for param_id, param_name, param_description in sorted_tuples:
-            new_item = self.search_list.add()
-            new_item.param_id = param_id
-            new_item.param_name = param_name
-            new_item.param_description = param_description
-
-    search_term : bpy.props.StringProperty(name="Search", update=search_param_list) # type: ignore
+    search_term : bpy.props.StringProperty(name="Search", update=schedule_search, options={'TEXTEDIT_UPDATE'}) # type: ignore
     search_list : bpy.props.CollectionProperty(type=ParamSearchListItem) # type: ignore
     search_list_index : bpy.props.IntProperty(default=-1, update=lambda self, context: selection_to_list(self, 'search_term', 'search_list', 'search_list_index', 'param_id', 'list', 'param_id')) # type: ignore
 
@@ -0,0 +1,41 @@
+"""Loads the add-on modules without Blender, bpy is replaced by a stub exposing what they use at import time."""
+import os
+import sys
+import types
+import importlib
+import importlib.util
+
+import pytest
+
+ADDON_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE = 'unexpectedslicer_tests'
+
+def stub_bpy():
+    if 'bpy' in sys.modules:
+        return
+    bpy = types.ModuleType('bpy')
+    app = types.ModuleType('bpy.app')
+    handlers = types.ModuleType('bpy.app.handlers')
+    handlers.persistent = lambda function: function
+    app.handlers = handlers
+    bpy.app = app
+    bpy.types = types.SimpleNamespace(Object=type('Object', (), {}), Mesh=type('Mesh', (), {}))
+    sys.modules.update({'bpy': bpy, 'bpy.app': app, 'bpy.app.handlers': handlers})
+
+def load_addon_module(name):
+    stub_bpy()
+    if PACKAGE not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            PACKAGE, os.path.join(ADDON_FOLDER, '__init__.py'), submodule_search_locations=[ADDON_FOLDER]
+        )
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[PACKAGE] = package
+        spec.loader.exec_module(package)
+    return importlib.import_module(f'{PACKAGE}.functions.{name}')
+
+# pytest imports the add-on's own __init__.py as the package holding the tests, so bpy has to exist beforehand
+stub_bpy()
+
+@pytest.fixture
+def addon():
+    return load_addon_module
@@ -0,0 +1,51 @@
+import os
+import multiprocessing
+
+def write_gcode(path, size=1000):
+    with open(path, 'w') as file:
+        file.write(";" * size)
+    return str(path)
+
+def put_many(directory, source, prefix, count):
+    from conftest import load_addon_module
+    cache = load_addon_module('caching_gcode').GcodeCache(directory)
+    for i in range(count):
+        cache.put(f"{prefix}{i}", source, {'print_time': str(i)})
+
+def test_read_hit_does_not_rewrite_the_index(addon, tmp_path):
+    cache = addon('caching_gcode').GcodeCache(str(tmp_path / "cache"))
+    cache.put("key", write_gcode(tmp_path / "a.gcode"), {'print_time': '1h'})
+
+    index_mtime = os.stat(cache.index_path).st_mtime_ns
+    entry = cache.get("key")
+    assert entry['stats'] == {'print_time': '1h'}
+    assert os.stat(cache.index_path).st_mtime_ns == index_mtime
+
+def test_concurrent_processes_keep_every_entry(addon, tmp_path):
+    directory = str(tmp_path / "cache")
+    source = write_gcode(tmp_path / "a.gcode")
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=put_many, args=(directory, source, f"p{n}-", 10)) for n in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    cache = addon('caching_gcode').GcodeCache(directory)
+    entries = cache._load_index()['entries']
+    assert len(entries) == 40
+    # No orphaned gcode or leftover temp copies
+    assert sorted(os.listdir(directory)) == sorted([entry['file'] for entry in entries.values()] + ["index.json", "index.lock"])
+
+def test_eviction_keeps_the_recently_read_entry(addon, tmp_path):
+    cache = addon('caching_gcode').GcodeCache(str(tmp_path / "cache"), max_bytes=2500)
+    source = write_gcode(tmp_path / "a.gcode")
+    cache.put("old", source)
+    cache.put("newer", source)
+    os.utime(os.path.join(cache.directory, "old.gcode"), (1, 1))
+    os.utime(os.path.join(cache.directory, "newer.gcode"), (2, 2))
+    cache.get("old")  # Touches old.gcode, so newer is now the least recently used
+
+    cache.put("newest", source)
+    assert cache.get("old") and cache.get("newest") and cache.get("newer") is None
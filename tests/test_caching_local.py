@@ -0,0 +1,73 @@
+import os
+import functools
+import multiprocessing
+
+def write_bundle(path, print_a_extra=""):
+    with open(path, 'w') as file:
+        file.write(
+            "[print:A]\n"
+            f"layer_height = 0.2{print_a_extra}\n"
+            "[print:B]\n"
+            "inherits = A\n"
+            "perimeters = 3\n"
+            "fill_pattern = gyroid\n"
+        )
+
+def lazy_cache(addon, directory):
+    cache = addon('caching_local').LocalCache(lazy=True)
+    cache.directory = str(directory)
+    cache.load_ini_files()
+    cache.process_all_files()
+    return cache
+
+def test_lazy_section_is_reparsed_after_an_earlier_section_grows(addon, tmp_path):
+    path = tmp_path / "bundle.ini"
+    write_bundle(path)
+    cache = lazy_cache(addon, tmp_path)
+
+    write_bundle(path, print_a_extra="\nfirst_layer_height = 0.3")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+    assert cache.get_conf_dict('print:B') == {'inherits': 'A', 'perimeters': '3', 'fill_pattern': 'gyroid'}
+    assert cache.resolve_config('print:B')['first_layer_height'] == '0.3'
+
+    # The rescan recorded the new stat, so the next folder scan sees nothing to parse
+    stat = os.stat(path)
+    assert cache.local_files[str(path)]['last_updated'] == stat.st_mtime
+    assert cache.local_files[str(path)]['size'] == stat.st_size
+    cache.load_ini_files()
+    assert not cache.has_changes()
+
+def test_lazy_section_removed_on_disk_raises(addon, tmp_path):
+    path = tmp_path / "bundle.ini"
+    write_bundle(path)
+    cache = lazy_cache(addon, tmp_path)
+
+    path.write_text("[print:A]\nlayer_height = 0.25\n")
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+    try:
+        cache.get_conf_dict('print:B')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected a ValueError for a section that was removed")
+    assert 'print:B' not in cache.config_headers
+
+def test_parallel_scan_works_with_spawned_workers(addon, tmp_path, monkeypatch, capsys):
+    # Spawned workers can't import the add-on package, like on Windows and macOS where its __init__ needs bpy
+    caching_local = addon('caching_local')
+    spawn_pool = functools.partial(caching_local.ProcessPoolExecutor, mp_context=multiprocessing.get_context('spawn'))
+    monkeypatch.setattr(caching_local, 'ProcessPoolExecutor', spawn_pool)
+    paths = []
+    for name in ("a", "b"):
+        paths.append(str(tmp_path / f"{name}.ini"))
+        write_bundle(paths[-1])
+    cache = caching_local.LocalCache(workers=2)
+
+    parsed = cache._parse_in_parallel(paths)
+
+    assert "unavailable" not in capsys.readouterr().out
+    assert parsed == {path: caching_local.read_ini_file(path) for path in paths}
@@ -0,0 +1,57 @@
+import numpy as np
+
+class FakeProperty:
+    def __init__(self, **attributes):
+        self.attributes = attributes
+
+    def __len__(self):
+        return len(next(iter(self.attributes.values())))
+
+    def foreach_get(self, attribute, out):
+        out[:] = self.attributes[attribute].ravel()
+
+class FakeMesh:
+    def __init__(self, name, vertices, triangles):
+        self.name = name
+        self.vertices = FakeProperty(co=vertices)
+        self.loop_triangles = FakeProperty(vertices=triangles)
+
+    def as_pointer(self):
+        return id(self)
+
+class FakeObject:
+    def __init__(self, name, mesh):
+        self.name = name
+        self.data = mesh
+        self.matrix_world = np.identity(4)
+        self.original = self
+
+def quad_object():
+    vertices = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]], dtype=np.float32)
+    triangles = np.array([[0, 1, 2], [0, 2, 3]], dtype=np.int32)
+    return FakeObject("Quad", FakeMesh("QuadMesh", vertices, triangles))
+
+def test_deformation_at_a_new_frame_is_not_served_from_cache(addon):
+    bf = addon('blender_funcs')
+    cache = addon('caching_mesh').MeshCache()
+    obj = quad_object()
+
+    first = bf.cached_objects_to_tris([obj], 1, cache)
+    assert first[:, :, 2].max() == 0
+
+    # Same topology and matrix, as an armature or shape key would leave them at the next frame
+    obj.data.vertices.attributes['co'][:, 2] = 5
+    cache.on_frame_change(None, None)
+
+    second = bf.cached_objects_to_tris([obj], 1, cache)
+    assert second[:, :, 2].min() == 5
+
+def test_unchanged_object_is_served_from_cache(addon):
+    bf = addon('blender_funcs')
+    cache = addon('caching_mesh').MeshCache()
+    obj = quad_object()
+
+    bf.cached_objects_to_tris([obj], 1, cache)
+    obj.data.vertices.attributes['co'][:, 2] = 5  # Not reported through a handler, so still cached
+
+    assert bf.cached_objects_to_tris([obj], 1, cache)[:, :, 2].max() == 0
@@ -0,0 +1,37 @@
+import zlib
+import struct
+
+import pytest
+
+PRINTER_METADATA = b"printer_model = MK4\nestimated printing time (normal mode) = 1h 2m 3s\n"
+
+def bgcode(metadata=PRINTER_METADATA):
+    compressed = zlib.compress(metadata)
+    block = struct.pack('<HHI', 3, 1, len(metadata)) + struct.pack('<I', len(compressed)) + struct.pack('<H', 0) + compressed
+    return struct.pack('<4sIH', b'GCDE', 1, 0) + block
+
+def test_bgcode_metadata_is_read(addon, tmp_path):
+    path = tmp_path / "plate.bgcode"
+    path.write_bytes(bgcode())
+
+    stats = addon('gcode_funcs').get_gcode_stats(str(path))
+
+    assert stats['estimated printing time (normal mode)'] == '1h 2m 3s'
+
+@pytest.mark.parametrize('cut', [14, 20, 23, -4])
+def test_truncated_bgcode_raises_value_error(addon, tmp_path, cut):
+    # Cuts inside the block header, the compressed size, the encoding and the deflate stream
+    path = tmp_path / "plate.bgcode"
+    path.write_bytes(bgcode()[:cut])
+
+    with pytest.raises(ValueError):
+        addon('gcode_funcs').get_gcode_stats(str(path))
+
+def test_corrupt_bgcode_raises_value_error(addon, tmp_path):
+    data = bytearray(bgcode())
+    data[-6:] = b'\xff' * 6
+    path = tmp_path / "plate.bgcode"
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError):
+        addon('gcode_funcs').get_gcode_stats(str(path))
@@ -0,0 +1,75 @@
+import os
+import sys
+import time
+
+import pytest
+
+SPAWNS_HELPER = (
+    "import subprocess, sys, time\n"
+    "helper = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+    "print(helper.pid, flush=True)\n"
+    "time.sleep(60)\n"
+)
+
+# Like C stdio: line buffered on a terminal, fully buffered on a pipe, and never flushed explicitly
+BUFFERED_PROGRESS = (
+    "import os, sys, time\n"
+    "out = open(1, 'w', buffering=-1, closefd=False)\n"
+    "out.write('10% => Processing triangulated mesh\\n')\n"
+    "out.write('30% => Generating perimeters\\n')\n"
+    "while not os.path.exists(sys.argv[1]):\n"
+    "    time.sleep(0.05)\n"
+    "out.write('Slicing result exported to plate.gcode\\n')\n"
+)
+
+def is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    with open(f"/proc/{pid}/stat") as file:
+        return file.read().split(') ')[-1][0] != 'Z'
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason="Inspects processes through /proc")
+def test_cancel_kills_processes_spawned_by_prusaslicer(addon):
+    job = addon('prusaslicer_funcs').SlicerJob(['-c', SPAWNS_HELPER], sys.executable).start()
+    deadline = time.time() + 10
+    while not job.output and time.time() < deadline:
+        time.sleep(0.05)
+    helper_pid = int(job.output[0])
+
+    job.cancel()
+
+    # The helper holds the output pipe open, so the job only finishes once it is gone too
+    assert job.done.wait(10)
+    assert job.error == "Cancelled"
+    deadline = time.time() + 5
+    while is_running(helper_pid) and time.time() < deadline:
+        time.sleep(0.05)
+    assert not is_running(helper_pid)
+
+@pytest.mark.parametrize('line, expected', [
+    ("30% => Generating perimeters", (30, 'Generating perimeters')),
+    ("[2024-05-01 10:00:00.000000] [info] Slicing process started", (10, 'Slicing')),
+    ("Slicing result exported to /tmp/x.gcode", (100, 'Gcode exported')),
+    ("[2024-05-01 10:00:00.000000] [error] Slicing failed", None),
+    ("Loading model", None),
+])
+def test_parse_progress_line(addon, line, expected):
+    assert addon('prusaslicer_funcs').parse_progress_line(line) == expected
+
+@pytest.mark.skipif(os.name == 'nt', reason="Output only reaches the job line by line through a pty")
+def test_progress_arrives_while_prusaslicer_runs(addon, tmp_path):
+    release = tmp_path / "release"
+    job = addon('prusaslicer_funcs').SlicerJob(['-c', BUFFERED_PROGRESS, str(release)], sys.executable).start()
+    try:
+        deadline = time.time() + 10
+        while job.progress[0] != 30 and time.time() < deadline:
+            time.sleep(0.05)
+
+        assert job.progress == (30, 'Generating perimeters')
+        assert job.process.poll() is None
+    finally:
+        release.touch()
+    assert job.done.wait(10)
+    assert job.error is None
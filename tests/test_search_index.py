@@ -0,0 +1,31 @@
+ROWS = [
+    ('first_layer_height', 'First Layer Height', 'Height of the first layer'),
+    ('layer_gcode', 'Layer G-code', 'Custom G-code inserted at each layer change'),
+    ('layer_height', 'Layer Height', 'Default layer height'),
+    ('max_layer_height', 'Max Layer Height', 'Highest layer height'),
+    ('raft_layers', 'Raft Layers', 'Number of raft layers'),
+]
+
+def test_key_starting_with_the_word_ranks_first(addon):
+    index = addon('search_index').ParamSearchIndex(ROWS)
+
+    assert [row[0] for row in index.search("layer")] == [
+        'layer_height', 'layer_gcode', 'max_layer_height', 'first_layer_height', 'raft_layers',
+    ]
+
+def test_substring_matches_use_the_ngram_index(addon):
+    index = addon('search_index').ParamSearchIndex(ROWS)
+
+    assert [row[0] for row in index.search("aft")] == ['raft_layers']
+    assert [row[0] for row in index.search("ayers")] == ['raft_layers']
+    assert index.search("yerl") == []
+
+def test_removed_keys_leave_no_tokens_behind(addon):
+    index = addon('search_index').ParamSearchIndex(ROWS)
+    index.sync_keys(['ironing_spacing'])
+    assert [row[0] for row in index.search("roni")] == ['ironing_spacing']
+
+    index.sync_keys([])
+
+    assert index.search("roni") == []
+    assert 'ironing' not in index.vocabulary and 'ron' not in index.grams